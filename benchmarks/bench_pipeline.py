@@ -0,0 +1,283 @@
+"""
+Per-stage micro benchmarks for the frame pipeline.
+
+Every hot path of a frame is measured in isolation on synthetic inputs, so the
+numbers can be compared against the 33 ms frame budget and between runs:
+
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+
+Stages whose dependencies are missing on the current machine are reported as
+skipped instead of failing the whole run. The quantized landmark backend is
+timed when LANDMARK_MODEL points to its ONNX or TFLite file.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+import numpy as np
+
+FRAME_W, FRAME_H = 1280, 720
+PREVIEW_SIZE = (853, 480)
+
+
+def synthetic_landmarks(rng, jitter=0.01):
+    """Normalized (21, 3) landmarks of an open right hand with a little jitter"""
+    from utils.landmark_backends import SyntheticBackend
+    # The synthetic backend's template hand, wrist moved into the lower middle of the frame
+    lm = SyntheticBackend.open_hand().astype(np.float64) + (0.5, 0.8, 0.0)
+    return lm + rng.normal(0, jitter, lm.shape)
+
+
+def synthetic_hand(rng):
+    """Hand in the format returned by HandDetector.findHands"""
+    from utils.hand import Hand
+    return Hand(synthetic_landmarks(rng) * (FRAME_W, FRAME_H, FRAME_W), "Right", 0.95)
+
+
+def measure(fn, iterations, warmup):
+    """Latency percentiles and allocations of fn()"""
+    for _ in range(warmup):
+        fn()
+
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        timings[i] = time.perf_counter_ns() - start
+    timings /= 1e6  # ms
+
+    # Second pass with tracemalloc so tracing does not distort the timings
+    alloc_iterations = max(1, min(iterations, 200))
+    peaks = np.empty(alloc_iterations)
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for i in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - baseline
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "mean_ms": float(timings.mean()),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "max_ms": float(timings.max()),
+        "alloc_peak_bytes_per_call": float(peaks.mean()),
+        "retained_blocks_per_call": (blocks_after - blocks_before) / alloc_iterations,
+    }
+
+
+# Stage setup functions return a zero-argument callable to time
+
+def stage_find_hands_postprocess(rng):
+    from utils._Digita import HandDetector
+    detector = HandDetector(detectionCon=0.8, maxHands=1, backend="synthetic")
+    detections = [(synthetic_landmarks(rng).astype(np.float32), "Left", 0.95)]
+    # Replace inference with precomputed detections so only our own post-processing is timed
+    detector.backend.process = lambda img: detections
+    img = rng.integers(0, 255, (FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    return lambda: detector.findHands(img, draw=False)
+
+
+def stage_backend(rng, name, **kwargs):
+    """One landmark model call on a 256x256 RGB crop"""
+    from utils.landmark_backends import create_backend
+    backend = create_backend(name, max_hands=1, **kwargs)
+    img = rng.integers(0, 255, (256, 256, 3), dtype=np.uint8)
+    return lambda: backend.process(img)
+
+
+def stage_frame_path(rng, pooled):
+    """Mirror, RGB conversion and hand-only canvas of one frame, allocating or reusing buffers"""
+    import cv2
+    img = rng.integers(0, 255, (FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    if not pooled:
+        def run():
+            mirrored = cv2.flip(img, 1)
+            cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB)
+            np.zeros_like(mirrored)
+        return run
+
+    from utils.frame_pool import FramePool
+    pool = FramePool(img.shape, 2)
+    rgb = np.empty_like(img)
+    canvas = np.empty_like(img)
+
+    def run():
+        mirrored = cv2.flip(img, 1, dst=pool.acquire())
+        cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB, dst=rgb)
+        canvas.fill(0)
+        pool.release(mirrored)
+    return run
+
+
+def stage_fingers_up(rng):
+    from utils._Digita import HandDetector
+    # The synthetic backend avoids constructing a MediaPipe model
+    detector = HandDetector(maxHands=1, backend="synthetic")
+    hand = synthetic_hand(rng)
+    return lambda: detector.fingersUp(hand)
+
+
+def stage_finger_states_batch(rng, n=1000):
+    from utils.finger_state import finger_states
+    batch = np.stack([synthetic_landmarks(rng) for _ in range(n)]) * (FRAME_W, FRAME_H, FRAME_W)
+    return lambda: finger_states(batch)
+
+
+def stage_preprocess_landmarks(rng, recognizer):
+    lmList = synthetic_hand(rng)["lmList"]
+    return lambda: recognizer.preprocess_landmarks(lmList)
+
+
+def stage_predict_gesture(rng, recognizer):
+    lmList = synthetic_hand(rng)["lmList"]
+    return lambda: recognizer.predict_gesture(lmList)
+
+
+def stage_draw_annotations(rng, strokes, points_per_stroke=20):
+    from utils.drawing_helper import DrawingHelper
+    helper = DrawingHelper()
+    for _ in range(strokes):
+        start = rng.integers(0, (FRAME_W, FRAME_H))
+        for step in rng.integers(-5, 6, (points_per_stroke, 2)):
+            start = start + step
+            helper.start_annotation((int(start[0]), int(start[1])))
+        helper.stop_annotation()
+    canvas = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    return lambda: helper.draw_annotations(canvas)
+
+
+def stage_draw_hand_skeleton(rng):
+    from utils.hand_drawing import draw_skeleton
+    hands = [synthetic_hand(rng)]
+    canvas = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    # What GestureControlApp.drawHandSkeleton draws, without importing Qt
+    return lambda: draw_skeleton(canvas, hands)
+
+
+def stage_qt_preview(rng):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt, QSize
+    from PyQt5.QtGui import QImage, QPixmap
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    img = rng.integers(0, 255, (FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    target = QSize(*PREVIEW_SIZE)
+
+    def convert():
+        h, w, ch = img.shape
+        qt_img = QImage(img.data, w, h, ch * w, QImage.Format_BGR888)
+        pixmap = QPixmap.fromImage(qt_img)
+        return pixmap.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    convert.app = app  # keep the application alive while timing
+    return convert
+
+
+def build_stages(rng):
+    """(name, setup) pairs; setup is called lazily so missing deps only skip one stage"""
+    recognizer = []
+
+    def get_recognizer():
+        if not recognizer:
+            from utils.ml_gesture_recognizer import MLGestureRecognizer
+            recognizer.append(MLGestureRecognizer())
+        return recognizer[0]
+
+    return [
+        ("findHands_postprocess", lambda: stage_find_hands_postprocess(rng)),
+        ("backend_mediapipe_full", lambda: stage_backend(rng, "mediapipe", model_complexity=1)),
+        ("backend_mediapipe_lite", lambda: stage_backend(rng, "mediapipe", model_complexity=0)),
+        ("backend_quantized", lambda: stage_backend(rng, "quantized", model_path=os.environ.get("LANDMARK_MODEL"))),
+        ("backend_synthetic", lambda: stage_backend(rng, "synthetic")),
+        ("frame_path_alloc", lambda: stage_frame_path(rng, pooled=False)),
+        ("frame_path_pooled", lambda: stage_frame_path(rng, pooled=True)),
+        ("fingersUp", lambda: stage_fingers_up(rng)),
+        ("finger_states_batch_1000", lambda: stage_finger_states_batch(rng)),
+        ("preprocess_landmarks", lambda: stage_preprocess_landmarks(rng, get_recognizer())),
+        ("predict_gesture", lambda: stage_predict_gesture(rng, get_recognizer())),
+        ("draw_annotations_10", lambda: stage_draw_annotations(rng, 10)),
+        ("draw_annotations_100", lambda: stage_draw_annotations(rng, 100)),
+        ("draw_annotations_1000", lambda: stage_draw_annotations(rng, 1000)),
+        ("drawHandSkeleton", lambda: stage_draw_hand_skeleton(rng)),
+        ("qt_preview_conversion", lambda: stage_qt_preview(rng)),
+    ]
+
+
+def run(iterations=500, warmup=20, only=None, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "stages": {},
+    }
+
+    for name, setup in build_stages(rng):
+        if only and name not in only:
+            continue
+        try:
+            fn = setup()
+        except Exception as e:
+            results["stages"][name] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        results["stages"][name] = measure(fn, iterations, warmup)
+    return results
+
+
+def print_report(results, baseline=None):
+    base_stages = baseline["stages"] if baseline else {}
+    print(f"{'stage':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc KiB':>11}{'vs base':>10}")
+    for name, stats in results["stages"].items():
+        if "skipped" in stats:
+            print(f"{name:<26}  skipped ({stats['skipped']})")
+            continue
+        change = ""
+        base = base_stages.get(name, {})
+        if "p50_ms" in base and base["p50_ms"] > 0:
+            change = f"{stats['p50_ms'] / base['p50_ms']:.2f}x"
+        print(f"{name:<26}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+              f"{stats['alloc_peak_bytes_per_call'] / 1024:>11.1f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the frame pipeline stage by stage")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--stage", action="append", help="Only run this stage (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare p50 latency against")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.warmup, args.stage, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
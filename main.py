@@ -19,13 +19,21 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"  # Suppress TensorFlow logging
 from utils._Digita import HandDetector
 from utils.ppt_converter import PPTConverter
 from utils.drawing_helper import DrawingHelper
-from utils.ml_gesture_recognizer import MLGestureRecognizer
+from utils.ml_gesture_recognizer import MLGestureRecognizer, DEFAULT_MODEL_PATH
+from utils.frame_capture import CapturePipeline
+from utils.inference_worker import HandInferenceProcess
+from utils.hand_drawing import draw_skeleton
+from utils.detection_scheduler import DetectionScheduler
+from utils.gesture_logic import GestureDecider, DEFAULT_GESTURES
+from utils.frame_metrics import FrameMetrics
+from utils.frame_pool import FramePool, reuse_buffer
+from utils.hand import primary_hand
 import win32com.client
 import time
 
 
 class GestureControlApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, process_inference=None):
         super().__init__()
         
         # Initialize logger
@@ -35,22 +43,47 @@ class GestureControlApp(QMainWindow):
         self.width, self.height = 1280, 720
         self.gestureThreshold = 600
         self.cap = None
+        self.capture_pipeline = None
+        self.display_pool = None  # Mirrored frames, sized when the camera starts
+        self.hand_canvas = None   # Reused background for hand-only mode
+        self.ui_poll_interval = 10  # ms between checks for new detection results
+        self.frames_shown = 0
         self.ppt_converter = PPTConverter()
         self.slide_images = []
         self.current_slide_idx = 0
-        self.detectorHand = HandDetector(detectionCon=0.8, maxHands=1)
+        # Optionally run MediaPipe in its own process so it gets a separate core and GIL
+        # (--process-inference or GESTURE_PROCESS_INFERENCE=1)
+        if process_inference is None:
+            process_inference = os.environ.get("GESTURE_PROCESS_INFERENCE", "0") == "1"
+        self.use_process_inference = process_inference
+        if self.use_process_inference:
+            self.detectorHand = HandInferenceProcess(detectionCon=0.8, maxHands=1, trackROI=True)
+        else:
+            self.detectorHand = HandDetector(detectionCon=0.8, maxHands=1, trackROI=True)
+        
+        # Skip inference while the hand is still and extrapolate the landmarks instead
+        self.detectionScheduler = DetectionScheduler(self.detectorHand, max_skip=2, motion_threshold=6.0)
         self.delay = 30
         self.buttonPressed = False
         self.counter = 0
         self.drawMode = False
         
         # Machine learning model
-        model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "gesture_model.pkl")
-        self.ml_recognizer = MLGestureRecognizer(model_path)
+        # Loaded from models/gesture_model.pkl, retrained only when the model configuration changed
+        self.ml_recognizer = MLGestureRecognizer(DEFAULT_MODEL_PATH)
+        self.calibration_mode = False  # Record labelled samples instead of controlling slides
+        self.shown_model_version = 0
+        self.classifierPending = False  # Distilled classifier being trained in the background
         
         # Drawing helper
         self.drawing_helper = DrawingHelper()
         
+        # Per-stage frame latency histograms, snapshot written to logs/ every 10 seconds
+        metrics_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "frame_metrics.prom")
+        self.frame_metrics = FrameMetrics(export_path=metrics_path, interval=10.0)
+        self.detectorHand.metrics = self.frame_metrics
+        self.ml_recognizer.metrics = self.frame_metrics
+        
         # Add drawing properties
         self.current_frame = None
         self.current_slide_image = None
@@ -72,18 +105,11 @@ class GestureControlApp(QMainWindow):
         self.setup_separate_windows()
         
         # Initialize gesture mappings
-        self.gestures = {
-            "next_slide": [0, 0, 0, 0, 1],  # Pinky finger
-            "prev_slide": [1, 0, 0, 0, 0],  # Thumb
-            "pointer": [0, 1, 1, 0, 0],     # Index + Middle
-            "draw": [0, 1, 0, 0, 0],        # Index finger
-            "erase": [0, 1, 1, 1, 0]        # Index + Middle + Ring
-        }
+        self.gestures = dict(DEFAULT_GESTURES)
         
-        # Gesture cooldown properties
-        self.last_gesture_time = 0
-        self.gesture_cooldown = 1.0  # seconds between gestures
-        self.last_processed_gesture = None
+        # Gesture decisions are shared with the headless replay engine
+        self.gestureDecider = GestureDecider(self.detectorHand, self.ml_recognizer, self.gestures,
+                                             threshold=self.gestureThreshold, cooldown=1.0)
         
     def setup_logger(self):
         """Setup logging for the application"""
@@ -248,6 +274,23 @@ class GestureControlApp(QMainWindow):
         self.handOnlyCheckbox.toggled.connect(self.toggleHandOnlyMode)
         cameraLayout.addWidget(self.handOnlyCheckbox)
         
+        # Landmark model: cheaper backends for slow machines
+        backendLayout = QHBoxLayout()
+        backendLayout.addWidget(QLabel("Landmark model:"))
+        self.backendSelector = QComboBox()
+        self.backendSelector.setStyleSheet("padding: 5px;")
+        self.backendSelector.addItem("MediaPipe (full)", ("mediapipe", 1))
+        self.backendSelector.addItem("MediaPipe (lite)", ("mediapipe", 0))
+        # The int8 model is not shipped, only offer it when it has been put into models/
+        self.quantizedModelPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                               "models", "hand_landmark_int8.onnx")
+        if os.path.exists(self.quantizedModelPath):
+            self.backendSelector.addItem("Quantized int8 (CPU)", ("quantized", None))
+        self.backendIndex = 0  # Index of the backend the detector actually runs
+        self.backendSelector.currentIndexChanged.connect(self.changeLandmarkBackend)
+        backendLayout.addWidget(self.backendSelector)
+        cameraLayout.addLayout(backendLayout)
+        
         cameraGroup.setLayout(cameraLayout)
         
         # Gesture controls
@@ -272,6 +315,42 @@ class GestureControlApp(QMainWindow):
         self.thresholdValueLabel.setAlignment(Qt.AlignCenter)
         gestureLayout.addWidget(self.thresholdValueLabel)
         
+        # Landmark smoothing: low follows fast swipes, high keeps drawing steady
+        smoothingLayout = QHBoxLayout()
+        smoothingLayout.addWidget(QLabel("Smoothing:"))
+        self.smoothingSlider = QSlider(Qt.Horizontal)
+        self.smoothingSlider.setMinimum(0)
+        self.smoothingSlider.setMaximum(100)
+        self.smoothingSlider.setValue(50)
+        self.smoothingSlider.valueChanged.connect(self.updateSmoothing)
+        smoothingLayout.addWidget(self.smoothingSlider)
+        gestureLayout.addLayout(smoothingLayout)
+        
+        # Gesture classifier: full random forest or the distilled MLP for weak machines
+        classifierLayout = QHBoxLayout()
+        classifierLayout.addWidget(QLabel("Classifier:"))
+        self.classifierSelector = QComboBox()
+        self.classifierSelector.setStyleSheet("padding: 5px;")
+        self.classifierSelector.addItem("Random forest", "forest")
+        self.classifierSelector.addItem("Distilled MLP (fast)", "distilled")
+        self.classifierSelector.currentIndexChanged.connect(self.changeClassifier)
+        classifierLayout.addWidget(self.classifierSelector)
+        gestureLayout.addLayout(classifierLayout)
+        
+        # Presenter calibration: record one gesture, the model retrains in the background when stopped
+        calibrationLayout = QHBoxLayout()
+        calibrationLayout.addWidget(QLabel("Calibrate:"))
+        self.calibrationSelector = QComboBox()
+        self.calibrationSelector.setStyleSheet("padding: 5px;")
+        for name in self.ml_recognizer.gesture_names[:-1]:
+            self.calibrationSelector.addItem(name.replace("_", " ").capitalize(), name)
+        calibrationLayout.addWidget(self.calibrationSelector)
+        self.calibrateBtn = self.createStyledButton("Record")
+        self.calibrateBtn.setCheckable(True)
+        self.calibrateBtn.toggled.connect(self.toggleCalibration)
+        calibrationLayout.addWidget(self.calibrateBtn)
+        gestureLayout.addLayout(calibrationLayout)
+        
         # Gesture customize button
         self.customizeGesturesBtn = self.createStyledButton("Customize Gestures", "preferences-desktop-gesture")
         self.customizeGesturesBtn.clicked.connect(self.openGestureSettings)
@@ -295,6 +374,10 @@ class GestureControlApp(QMainWindow):
         self.slideLabel.setStyleSheet("font-size: 13px;")
         statusLayout.addWidget(self.slideLabel)
         
+        self.pipelineStatsLabel = QLabel("Frames: N/A")
+        self.pipelineStatsLabel.setStyleSheet("font-size: 12px; color: #7f8c8d;")
+        statusLayout.addWidget(self.pipelineStatsLabel)
+        
         statusGroup.setLayout(statusLayout)
         
         # Add spacer to push controls to the top
@@ -376,6 +459,7 @@ class GestureControlApp(QMainWindow):
             new_gestures = dialog.getGestures()
             # Update gestures
             self.gestures = new_gestures
+            self.gestureDecider.gestures = dict(new_gestures)
             # Save and update UI
             self.statusBar.showMessage("Gesture settings updated")
             
@@ -507,8 +591,84 @@ class GestureControlApp(QMainWindow):
     def updateThreshold(self, value):
         """Update gesture threshold from slider"""
         self.gestureThreshold = value
+        self.gestureDecider.threshold = value
         self.thresholdValueLabel.setText(f"Current: {value}")
     
+    def changeLandmarkBackend(self, index):
+        """Switch the hand landmark model selected in the combo box"""
+        backend, complexity = self.backendSelector.itemData(index)
+        model_path = self.quantizedModelPath if backend == "quantized" else None
+        try:
+            self.detectorHand.setBackend(backend, modelPath=model_path, modelComplexity=complexity)
+            self.backendIndex = index
+            self.statusBar.showMessage(f"Landmark model: {self.backendSelector.currentText()}")
+        except Exception as e:
+            self.logger.error(f"Could not switch landmark model: {str(e)}")
+            # The detector kept its previous model, show that one again
+            self.backendSelector.blockSignals(True)
+            self.backendSelector.setCurrentIndex(self.backendIndex)
+            self.backendSelector.blockSignals(False)
+            QMessageBox.warning(self, "Warning", f"Could not load landmark model: {str(e)}")
+    
+    def changeClassifier(self, index):
+        """Switch the gesture classifier selected in the combo box"""
+        try:
+            # A missing distilled model is trained in the background, checkClassifier() reports it
+            self.classifierPending = not self.ml_recognizer.set_classifier(
+                self.classifierSelector.itemData(index), wait=False)
+            if self.classifierPending:
+                self.statusBar.showMessage("Preparing gesture classifier in the background...")
+            else:
+                self.statusBar.showMessage(f"Gesture classifier: {self.classifierSelector.currentText()}")
+        except Exception as e:
+            self.logger.error(f"Could not switch gesture classifier: {str(e)}")
+    
+    def toggleCalibration(self, checked):
+        """Start recording samples of the selected gesture, or stop and retrain in the background"""
+        self.calibration_mode = checked
+        self.calibrationSelector.setEnabled(not checked)
+        if checked:
+            self.calibrateBtn.setText("Stop")
+            self.statusBar.showMessage(f"Calibrating: show the '{self.calibrationSelector.currentText()}' gesture")
+            return
+        self.calibrateBtn.setText("Record")
+        if len(self.ml_recognizer.calibration):
+            self.ml_recognizer.retrain_async()
+            self.statusBar.showMessage(
+                f"Retraining gesture model on {len(self.ml_recognizer.calibration)} samples in the background...")
+    
+    def checkModelSwap(self):
+        """Report a gesture model that was retrained in the background and swapped in"""
+        if self.ml_recognizer.model_version == self.shown_model_version:
+            return
+        self.shown_model_version = self.ml_recognizer.model_version
+        # The swap falls back to the random forest
+        self.classifierPending = False
+        self.classifierSelector.blockSignals(True)
+        self.classifierSelector.setCurrentIndex(self.classifierSelector.findData("forest"))
+        self.classifierSelector.blockSignals(False)
+        self.statusBar.showMessage("Gesture model updated with calibration samples")
+    
+    def checkClassifier(self):
+        """Report the distilled classifier once its background training finished"""
+        distiller = self.ml_recognizer.distiller
+        if not self.classifierPending or (distiller is not None and distiller.busy):
+            return
+        self.classifierPending = False
+        if self.ml_recognizer.classifier == self.classifierSelector.currentData():
+            self.statusBar.showMessage(f"Gesture classifier: {self.classifierSelector.currentText()}")
+            return
+        # Distilling failed or the forest was retrained meanwhile, show the classifier still in use
+        self.classifierSelector.blockSignals(True)
+        self.classifierSelector.setCurrentIndex(self.classifierSelector.findData(self.ml_recognizer.classifier))
+        self.classifierSelector.blockSignals(False)
+        self.statusBar.showMessage("Could not prepare the distilled classifier, using the random forest")
+    
+    def updateSmoothing(self, value):
+        """Update the landmark filter lag-vs-jitter setting from slider"""
+        if hasattr(self.detectorHand, "setSmoothing"):
+            self.detectorHand.setSmoothing(value / 100.0)
+    
     def prev_slide(self):
         """Navigate to previous slide"""
         if self.slide_images and self.current_slide_idx > 0:
@@ -629,28 +789,71 @@ class GestureControlApp(QMainWindow):
         display_image = self.current_slide_image.copy()
         
         # Draw annotations
-        display_image = self.drawing_helper.draw_annotations(display_image)
+        with self.frame_metrics.stage("annotation_rendering"):
+            display_image = self.drawing_helper.draw_annotations(display_image)
         
         # Show presentation
         cv2.imshow("Presentation", display_image)
     
+    def captureAndDetect(self, img):
+        """Runs on the inference thread: mirror the frame into a pooled buffer and detect hands"""
+        if self.display_pool is not None and img.shape == self.display_pool.shape:
+            img = cv2.flip(img, 1, dst=self.display_pool.acquire())
+        else:
+            img = cv2.flip(img, 1)
+        # The camera frame is not shown in hand-only mode, so skip the overlay
+        hands, _ = self.detectionScheduler.findHands(img, draw=not self.hand_only_mode)
+        return img, hands
+
+    def releaseDisplayFrame(self, result):
+        """Return a mirrored frame to the pool once the GUI is done with it"""
+        if self.display_pool is not None:
+            self.display_pool.release(result[0])
+    
+    def updatePipelineStats(self):
+        """Show dropped and stale frame counters from the capture pipeline"""
+        if self.capture_pipeline is None:
+            return
+        stats = self.capture_pipeline.get_stats()
+        scheduler_stats = self.detectionScheduler.get_stats()
+        stillness_stats = self.gestureDecider.stillness.get_stats()
+        cascade_stats = self.gestureDecider.cascade.get_stats()
+        backend_info = ""
+        if hasattr(self.detectorHand, "getBackendStats"):
+            backend_stats = self.detectorHand.getBackendStats()
+            backend_info = f" ({backend_stats['backend']} p50 {backend_stats['p50_ms']:.1f} ms)"
+        self.pipelineStatsLabel.setText(
+            f"Frames: {stats['processed']} processed, {stats['dropped']} dropped, "
+            f"{stats['stale']} stale ({stats['process_fps']:.1f} fps), "
+            f"{stats['pool_misses'] + self.display_pool.misses} buffer misses\n"
+            f"Inference: {scheduler_stats['inferences']} run, {scheduler_stats['skipped']} skipped{backend_info}\n"
+            f"Gestures: {stillness_stats['hits']} reused while still, {cascade_stats['rule']} by rule, "
+            f"{cascade_stats['model']} by model ({cascade_stats['rule_ratio']:.0%} rule)"
+        )
+    
     def updateFrame(self):
         try:
-            if self.cap is None or not self.cap.isOpened():
+            if self.capture_pipeline is None:
                 return
             
-            success, img = self.cap.read()
-            if not success:
+            # Only consume results, capture and detection run on their own threads
+            result = self.capture_pipeline.latest_result()
+            if result is None:
                 return
-
-            img = cv2.flip(img, 1)
+            
+            img, hands = result
+            self.frames_shown += 1
+            if self.frames_shown % 30 == 0:
+                self.updatePipelineStats()
+                self.checkModelSwap()
+                self.checkClassifier()
             
             try:
-                hands, _ = self.detectorHand.findHands(img, draw=True)
-                
                 # Create display image based on mode
                 if self.hand_only_mode:
-                    display_img = np.zeros((img.shape[0], img.shape[1], 3), dtype=np.uint8)
+                    self.hand_canvas = reuse_buffer(self.hand_canvas, img.shape)
+                    self.hand_canvas.fill(0)
+                    display_img = self.hand_canvas
                     
                     if hands:
                         self.handStatusLabel.setText(f"Hand Detection: Detected {len(hands)} hand(s)")
@@ -666,6 +869,7 @@ class GestureControlApp(QMainWindow):
                 
                 # Convert to Qt format with error handling
                 try:
+                    preview_start = time.perf_counter()
                     h, w, ch = display_img.shape
                     bytes_per_line = ch * w
                     qt_img = QImage(display_img.data, w, h, bytes_per_line, QImage.Format_BGR888)
@@ -677,14 +881,29 @@ class GestureControlApp(QMainWindow):
                             Qt.SmoothTransformation
                         )
                         self.previewWidget.setPixmap(scaled_pixmap)
+                    self.frame_metrics.record("preview_conversion", (time.perf_counter() - preview_start) * 1000)
                 except Exception as e:
                     self.logger.error(f"Qt image conversion error: {str(e)}")
                 
                 # Process gestures
-                if hands and not self.buttonPressed and self.slide_images:
+                if self.calibration_mode:
+                    hand = primary_hand(hands)
+                    # Extrapolated hands from skipped inferences are not real samples of the gesture
+                    if hand is not None and not hand.predicted:
+                        self.ml_recognizer.add_calibration_sample(
+                            hand.landmarks, self.calibrationSelector.currentData())
+                elif hands and not self.buttonPressed and self.slide_images:
                     self.processHandGestures(hands, display_img)
                 else:
+                    # No hand to steer with: end the stroke, forget the swipe window and the cached pose
                     self.drawing_helper.stop_annotation()
+                    for event in self.gestureDecider.decide([], time.time())["events"]:
+                        self.applyGestureEvent(event)
+                
+                # Capture to fully handled frame
+                self.frame_metrics.record(
+                    "frame_total", (time.perf_counter() - self.capture_pipeline.last_timestamp) * 1000)
+                self.frame_metrics.maybe_export()
                     
             except KeyError as ke:
                 self.logger.error(f"KeyError in hand detection: {str(ke)}")
@@ -695,101 +914,62 @@ class GestureControlApp(QMainWindow):
     
     def drawHandSkeleton(self, canvas, hands):
         """Draw hand skeleton with connections"""
-        for hand in hands:
-            lmList = hand["lmList"]
-            
-            # Draw connections
-            connections = [
-                (0, 1), (1, 2), (2, 3), (3, 4),  # Thumb
-                (0, 5), (5, 6), (6, 7), (7, 8),  # Index
-                (5, 9), (9, 10), (10, 11), (11, 12),  # Middle
-                (9, 13), (13, 14), (14, 15), (15, 16),  # Ring
-                (13, 17), (17, 18), (18, 19), (19, 20),  # Pinky
-                (0, 17), (0, 5), (5, 9), (9, 13), (13, 17)  # Palm
-            ]
-            
-            for connection in connections:
-                start = tuple(map(int, lmList[connection[0]][:2]))
-                end = tuple(map(int, lmList[connection[1]][:2]))
-                cv2.line(canvas, start, end, (255, 255, 255), 2)
-            
-            # Draw landmarks
-            for point in lmList:
-                cv2.circle(canvas, (int(point[0]), int(point[1])), 4, (0, 255, 0), -1)
+        draw_skeleton(canvas, hands)
 
     def processHandGestures(self, hands, img):
         try:
             if not hands:
                 return
 
-            hand = hands[0]
-            cx, cy = hand["center"]
-            lmList = hand["lmList"]
-            fingers = self.detectorHand.fingersUp(hand)
-            
-            current_time = time.time()
+            with self.frame_metrics.stage("gesture_decision"):
+                decision = self.gestureDecider.decide(
+                    hands, time.time(),
+                    can_prev=self.current_slide_idx > 0,
+                    can_next=self.current_slide_idx < len(self.slide_images) - 1)
+            fingers = decision["fingers"]
+            gesture = decision["gesture"]
+            cx, cy = decision["center"]
             
-            # Get ML gesture prediction
-            ml_gesture = self.ml_recognizer.predict_gesture(lmList)
+            # Update UI, including which cascade stage decided
+            self.gestureStatusLabel.setText(f"Current Gesture: {gesture} ({fingers}, {decision['stage']})")
             
-            # Update UI
-            self.gestureStatusLabel.setText(f"Current Gesture: {ml_gesture} ({fingers})")
-            
-            # Process gestures if hand is above threshold and cooldown has passed
-            if cy <= self.gestureThreshold and (current_time - self.last_gesture_time) >= self.gesture_cooldown:
-                # Previous slide
-                if fingers == [1, 0, 0, 0, 0] or ml_gesture == "previous_slide":
-                    if self.current_slide_idx > 0:
-                        self.prev_slide()
-                        self.last_gesture_time = current_time
-                        self.last_processed_gesture = "previous_slide"
-                        self.statusBar.showMessage("Gesture: Previous Slide")
-                
-                # Next slide
-                elif fingers == [0, 0, 0, 0, 1] or ml_gesture == "next_slide":
-                    if self.current_slide_idx < len(self.slide_images) - 1:
-                        self.next_slide()
-                        self.last_gesture_time = current_time
-                        self.last_processed_gesture = "next_slide"
-                        self.statusBar.showMessage("Gesture: Next Slide")
-            
-            # Continuous gestures (no cooldown)
-            # Drawing mode
-            if fingers == [0, 1, 0, 0, 0] or ml_gesture == "draw":
-                self.drawMode = True
-                indexFinger = (int(lmList[8][0]), int(lmList[8][1]))
-                self.drawing_helper.start_annotation(indexFinger)
-                self.statusBar.showMessage("Mode: Drawing")
-            else:
-                self.drawMode = False
-                self.drawing_helper.stop_annotation()
-            
-            # Pointer mode
-            if fingers == [0, 1, 1, 0, 0] or ml_gesture == "pointer":
-                indexFinger = (int(lmList[8][0]), int(lmList[8][1]))
-                if self.current_slide_image is not None:
-                    self.current_slide_image = self.current_slide_image.copy()
-                    cv2.circle(self.current_slide_image, indexFinger, 10, (0, 0, 255), -1)
-                    self.updatePresentationWindow()
-                self.statusBar.showMessage("Mode: Pointer")
-            
-            # Erase last annotation
-            if (fingers == [0, 1, 1, 1, 0] or ml_gesture == "erase") and \
-               self.last_processed_gesture != "erase" and \
-               (current_time - self.last_gesture_time) >= self.gesture_cooldown:
-                self.drawing_helper.undo_last_annotation()
-                self.updatePresentationWindow()
-                self.last_gesture_time = current_time
-                self.last_processed_gesture = "erase"
-                self.statusBar.showMessage("Action: Erased last drawing")
+            for event in decision["events"]:
+                self.applyGestureEvent(event)
             
             # Debug information
-            debug_text = f"Fingers: {fingers}\nGesture: {ml_gesture}\nHeight: {cy}"
+            debug_text = f"Fingers: {fingers}\nGesture: {gesture}\nHeight: {cy}"
             cv2.putText(img, debug_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
             
         except Exception as e:
             self.statusBar.showMessage(f"Error processing gesture: {str(e)}")
 
+    def applyGestureEvent(self, event):
+        """Apply one event produced by the gesture decider"""
+        event_type = event["type"]
+        if event_type == "previous_slide":
+            self.prev_slide()
+            self.statusBar.showMessage("Gesture: Previous Slide")
+        elif event_type == "next_slide":
+            self.next_slide()
+            self.statusBar.showMessage("Gesture: Next Slide")
+        elif event_type == "draw":
+            self.drawMode = True
+            self.drawing_helper.start_annotation(event["point"])
+            self.statusBar.showMessage("Mode: Drawing")
+        elif event_type == "draw_end":
+            self.drawMode = False
+            self.drawing_helper.stop_annotation()
+        elif event_type == "pointer":
+            if self.current_slide_image is not None:
+                self.current_slide_image = self.current_slide_image.copy()
+                cv2.circle(self.current_slide_image, event["point"], 10, (0, 0, 255), -1)
+                self.updatePresentationWindow()
+            self.statusBar.showMessage("Mode: Pointer")
+        elif event_type == "erase":
+            self.drawing_helper.undo_last_annotation()
+            self.updatePresentationWindow()
+            self.statusBar.showMessage("Action: Erased last drawing")
+
     def compareGestures(self, detected, reference):
         """Compare detected gesture with reference gesture with some tolerance"""
         return detected == reference
@@ -849,7 +1029,22 @@ class GestureControlApp(QMainWindow):
                 self.startCamBtn.setEnabled(False)
                 self.stopCamBtn.setEnabled(True)
                 self.cameraSelector.setEnabled(False)
-                self.timer.start(30)  # Update every 30ms
+                
+                # Frame buffers are allocated once for the camera's actual resolution
+                frame_shape = (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                               int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+                # Result waiting for the GUI, result on screen, frame being processed, one spare
+                self.display_pool = FramePool(frame_shape, 4)
+                self.hand_canvas = np.zeros(frame_shape, dtype=np.uint8)
+                
+                # Camera reads and hand detection run off the GUI thread
+                self.capture_pipeline = CapturePipeline(self.cap, self.captureAndDetect,
+                                                        metrics=self.frame_metrics,
+                                                        frame_shape=frame_shape,
+                                                        release_result=self.releaseDisplayFrame)
+                self.capture_pipeline.start()
+                self.frames_shown = 0
+                self.timer.start(self.ui_poll_interval)
                 self.statusBar.showMessage(f"Camera {camera_id} started")
                 self.handStatusLabel.setText("Hand Detection: Active")
             else:
@@ -862,8 +1057,14 @@ class GestureControlApp(QMainWindow):
     def stopCamera(self):
         """Stop camera capture"""
         try:
+            self.timer.stop()
+            if self.capture_pipeline is not None:
+                self.updatePipelineStats()
+                self.capture_pipeline.stop()
+                self.capture_pipeline = None
+                self.frame_metrics.export()
+            
             if self.cap and self.cap.isOpened():
-                self.timer.stop()
                 self.cap.release()
                 
             self.cap = None
@@ -881,6 +1082,17 @@ class GestureControlApp(QMainWindow):
         except Exception as e:
             self.statusBar.showMessage(f"Error stopping camera: {str(e)}")
     
+    def closeEvent(self, event):
+        """Stop capture threads and the inference worker before closing"""
+        self.stopCamera()
+        if isinstance(self.detectorHand, HandInferenceProcess):
+            self.detectorHand.stop()
+        if self.ml_recognizer.trainer is not None:
+            self.ml_recognizer.trainer.shutdown()
+        if self.ml_recognizer.distiller is not None:
+            self.ml_recognizer.distiller.shutdown()
+        super().closeEvent(event)
+    
     def updateSlideLabel(self):
         """Update the slide label with current slide number and total slides"""
         if self.slide_images:
@@ -1022,6 +1234,6 @@ if __name__ == "__main__":
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     
     app = QApplication(sys.argv)
-    window = GestureControlApp()
+    window = GestureControlApp(process_inference="--process-inference" in sys.argv[1:] or None)
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
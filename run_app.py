@@ -31,7 +31,7 @@ if __name__ == "__main__":
         
         app = QApplication(sys.argv)
         try:
-            window = GestureControlApp()
+            window = GestureControlApp(process_inference="--process-inference" in sys.argv[1:] or None)
             window.show()
         except AttributeError as ae:
             logger.error(f"Initialization error: {str(ae)}")
@@ -0,0 +1,148 @@
+import sys
+import os
+import json
+import time
+import socket
+import argparse
+
+# Add path to utils
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Import debug helper functions and set environment variables
+from utils.debug_helper import setup_environment, setup_logging
+
+
+class EventWriter:
+    """Writes events as newline-delimited JSON to stdout or a TCP socket"""
+    def __init__(self, address=None):
+        self.address = address
+        self.sock = None
+        if address:
+            self.connect()
+
+    def connect(self):
+        host, port = self.address.rsplit(":", 1)
+        try:
+            self.sock = socket.create_connection((host, int(port)), timeout=2.0)
+        except OSError:
+            self.sock = None
+
+    def write(self, event):
+        line = json.dumps(event) + "\n"
+        if self.address is None:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            return
+
+        if self.sock is None:
+            self.connect()
+        if self.sock is not None:
+            try:
+                self.sock.sendall(line.encode("utf-8"))
+            except OSError:
+                # Drop the event and reconnect on the next one
+                self.sock.close()
+                self.sock = None
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run gesture detection without a GUI and stream events as JSON lines")
+    parser.add_argument("--camera", type=int, default=0, help="Camera index")
+    parser.add_argument("--video", help="Read frames from a video file instead of a camera")
+    parser.add_argument("--socket", help="Send events to HOST:PORT over TCP instead of stdout")
+    parser.add_argument("--slides", type=int, help="Number of slides, to suppress out-of-range slide events")
+    parser.add_argument("--threshold", type=int, default=600, help="Gesture threshold line in pixels")
+    parser.add_argument("--backend", default="mediapipe", choices=["mediapipe", "quantized", "synthetic"],
+                        help="Hand landmark model")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1],
+                        help="MediaPipe model size, 0 is the lite model")
+    parser.add_argument("--model-path", help="ONNX or TFLite file for the quantized backend")
+    parser.add_argument("--classifier", default="forest", choices=["forest", "distilled"],
+                        help="Gesture classifier, distilled is a small MLP trained on the forest")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    return parser.parse_args()
+
+
+def run_camera(args, engine, detector):
+    """Live capture: reader and detection threads, events handled on this thread"""
+    import cv2
+    import numpy as np
+    from utils.frame_capture import CapturePipeline
+
+    cap = cv2.VideoCapture(args.camera)
+    cap.set(3, args.width)
+    cap.set(4, args.height)
+    if not cap.isOpened():
+        raise IOError(f"Could not open camera {args.camera}")
+
+    frame_shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+    mirrored = np.empty(frame_shape, dtype=np.uint8)
+
+    def detect(img):
+        # Only the hands leave this function, so one mirror buffer is enough
+        img = cv2.flip(img, 1, dst=mirrored if img.shape == mirrored.shape else None)
+        hands, _ = detector.findHands(img, draw=False)
+        return hands
+
+    pipeline = CapturePipeline(cap, detect, frame_shape=frame_shape)
+    pipeline.start()
+    start = time.perf_counter()
+    try:
+        while True:
+            hands = pipeline.latest_result()
+            if hands is None:
+                time.sleep(0.002)
+                continue
+            engine.process(pipeline.last_timestamp - start, hands)
+    finally:
+        pipeline.stop()
+        cap.release()
+
+
+if __name__ == "__main__":
+    # Setup environment variables first (before other imports)
+    setup_environment()
+
+    # Logs go to the log file and stderr, stdout only carries events
+    logger = setup_logging()
+    logger.info("Starting Gesture Digita headless mode")
+
+    args = parse_args()
+
+    # No PyQt5 anywhere on this path
+    from utils._Digita import HandDetector
+    from utils.ml_gesture_recognizer import MLGestureRecognizer, DEFAULT_MODEL_PATH
+    from utils.detection_scheduler import DetectionScheduler
+    from utils.gesture_logic import GestureDecider
+    from utils.replay_engine import ReplayEngine
+
+    detector = HandDetector(detectionCon=0.8, maxHands=1, trackROI=True, backend=args.backend,
+                            modelComplexity=args.model_complexity, modelPath=args.model_path)
+    recognizer = MLGestureRecognizer(DEFAULT_MODEL_PATH)
+    recognizer.set_classifier(args.classifier)
+    decider = GestureDecider(detector, recognizer, threshold=args.threshold)
+    writer = EventWriter(args.socket)
+    engine = ReplayEngine(decider, DetectionScheduler(detector), num_slides=args.slides, on_event=writer.write)
+
+    try:
+        if args.video:
+            summary = engine.replay_video(args.video)
+            logger.info(f"Video processed: {summary}")
+        else:
+            run_camera(args, engine, engine.detector)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Consumer of stdout went away
+        pass
+    except Exception as e:
+        logger.exception(f"Error in headless mode: {str(e)}")
+        sys.exit(1)
+    finally:
+        logger.info(f"Landmark backend: {detector.getBackendStats()}")
+        writer.close()
@@ -1,145 +1,252 @@
 import math
+import time
+import threading
 import numpy as np
 
 import cv2
-import mediapipe as mp
+
+from utils.hand import Hand
+from utils.hand_drawing import draw_hand
+from utils.finger_state import finger_states, THUMB_ANGLE, FINGER_ANGLE
+from utils.landmark_filters import LandmarkFilterBank
+from utils.hand_tracker import HandTracker
+from utils.frame_pool import reuse_buffer
+from utils.landmark_backends import create_backend
 
 
 class HandDetector:
-    def __init__(self, staticMode=False, maxHands=2, modelComplexity=1, detectionCon=0.8, minTrackCon=0.8):
+    def __init__(self, staticMode=False, maxHands=2, modelComplexity=1, detectionCon=0.8, minTrackCon=0.8,
+                 trackROI=False, roiSize=256, roiPadding=0.6, roiRefresh=30, trackedWidth=640,
+                 thumbAngle=THUMB_ANGLE, fingerAngle=FINGER_ANGLE,
+                 filterType="one_euro", smoothing=0.5, backend="mediapipe", modelPath=None):
 
         self.staticMode = staticMode
         self.maxHands = maxHands
         self.modelComplexity = modelComplexity
         self.detectionCon = detectionCon
         self.minTrackCon = minTrackCon
-        self.mpHands = mp.solutions.hands # type: ignore
-        self.hands = self.mpHands.Hands(
-            static_image_mode=self.staticMode,
-            max_num_hands=self.maxHands,
-            model_complexity=1,  # Use more complex model
-            min_detection_confidence=self.detectionCon,
-            min_tracking_confidence=self.minTrackCon)
-
-        self.mpDraw = mp.solutions.drawing_utils # type: ignore
+
+        # Landmark model: "mediapipe", "quantized" (ONNX/TFLite int8, needs modelPath) or "synthetic"
+        self.backendName = backend
+        self.modelPath = modelPath
+        self.backendLock = threading.Lock()
+        self.backend = self.createBackend()
+
         self.tipIds = [4, 8, 12, 16, 20]
         self.fingers = []
         self.lmList = []
 
-        # Add smoothing parameters
-        self.smoothening = 0.1
-        self.prev_landmarks = None
+        # Joint angles (degrees) above which a finger counts as up
+        self.thumbAngle = thumbAngle
+        self.fingerAngle = fingerAngle
+
+        # Persistent hand IDs across frames
+        self.tracker = HandTracker()
+
+        # Per-hand landmark filtering (One Euro or Kalman), smoothing trades lag against jitter
+        self.landmarkFilter = LandmarkFilterBank(filterType, smoothing)
+
+        # ROI tracking: detect on a small crop around the last hand position. Backends that track
+        # the hand themselves (MediaPipe in video mode) get the whole frame, downscaled, instead
+        self.trackROI = trackROI
+        self.roiSize = roiSize          # Side of the square input fed to MediaPipe
+        self.roiPadding = roiPadding    # Padding around the last bbox, relative to its size
+        self.roiRefresh = roiRefresh    # Full-frame search every N frames to pick up new hands
+        self.trackedWidth = trackedWidth  # Max input width for self-tracking backends
+        self.lastBbox = None
+        self.roiFrames = 0
+
+        # Optional FrameMetrics recorder for per-stage latency
+        self.metrics = None
+
+        # Model input buffers, reused every frame while the frame size stays the same
+        self.rgbBuffers = {}  # (h, w, c) -> RGB buffer, one for full frames and one for ROI crops
+        self.resizeBuffer = None
+
+    def createBackend(self):
+        return create_backend(self.backendName, max_hands=self.maxHands, model_complexity=self.modelComplexity,
+                              detection_con=self.detectionCon, min_track_con=self.minTrackCon,
+                              static_mode=self.staticMode, model_path=self.modelPath)
+
+    def setBackend(self, backend, modelPath=None, modelComplexity=None):
+        """Switch the landmark model at runtime; the old one is closed once no frame is using it"""
+        previous = (self.backendName, self.modelPath, self.modelComplexity)
+        self.backendName = backend
+        self.modelPath = modelPath
+        if modelComplexity is not None:
+            self.modelComplexity = modelComplexity
+        try:
+            newBackend = self.createBackend()
+        except Exception:
+            self.backendName, self.modelPath, self.modelComplexity = previous
+            raise
+
+        with self.backendLock:
+            oldBackend, self.backend = self.backend, newBackend
+            self.lastBbox = None
+        oldBackend.close()
+
+    def setModelComplexity(self, modelComplexity):
+        """MediaPipe model size: 0 is the lite model, 1 the full one"""
+        self.setBackend(self.backendName, self.modelPath, modelComplexity)
+
+    def getBackendStats(self):
+        """Measured latency of the active landmark backend"""
+        return self.backend.get_stats()
+
+    def reset(self):
+        """Forget all per-video state: backend tracking, track IDs, landmark filters and the ROI"""
+        with self.backendLock:
+            self.backend.reset()
+            self.lastBbox = None
+            self.roiFrames = 0
+        self.tracker.reset()
+        self.landmarkFilter.reset()
+
+    def setSmoothing(self, smoothing):
+        """Lag-vs-jitter setting: 0 follows the hand tightly, 1 gives the steadiest landmarks"""
+        self.landmarkFilter.set_smoothing(smoothing)
+
+    def toRGB(self, img, size=None):
+        """Convert a BGR frame (resized to size, a square side or (w, h), if given) into the RGB model input"""
+        start = time.perf_counter()
+        if size is not None:
+            dsize = (size, size) if isinstance(size, int) else tuple(size)
+            self.resizeBuffer = reuse_buffer(self.resizeBuffer, (dsize[1], dsize[0], 3))
+            img = cv2.resize(img, dsize, dst=self.resizeBuffer, interpolation=cv2.INTER_AREA)
+        rgbBuffer = self.rgbBuffers.get(img.shape)
+        if rgbBuffer is None:
+            if len(self.rgbBuffers) >= 2:
+                # Frame size changed, drop the buffers of the old size
+                self.rgbBuffers.clear()
+            rgbBuffer = self.rgbBuffers[img.shape] = np.empty(img.shape, dtype=np.uint8)
+        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=rgbBuffer)
+        if self.metrics is not None:
+            self.metrics.record("color_conversion", (time.perf_counter() - start) * 1000)
+        return imgRGB
+
+    def runInference(self, imgRGB):
+        """Run the landmark backend, returns [(normalized (21, 3) landmarks, label, score), ...]"""
+        start = time.perf_counter()
+        with self.backendLock:
+            detections = self.backend.process(imgRGB)
+        if self.metrics is not None:
+            self.metrics.record("inference", (time.perf_counter() - start) * 1000)
+        return detections
+
+    def trackingRoi(self, w, h):
+        """
+        Square crop (x0, y0, side) around the last detected hands, or None for a full-frame search
+        """
+        if self.lastBbox is None or self.roiFrames >= self.roiRefresh:
+            return None
+
+        bx, by, bw, bh = self.lastBbox
+        side = int(max(bw, bh) * (1 + 2 * self.roiPadding))
+        if side >= min(w, h):
+            return None
+        side = max(side, self.roiSize // 2)
+
+        # Center the crop on the hand and keep it inside the frame
+        x0 = int(bx + bw / 2 - side / 2)
+        y0 = int(by + bh / 2 - side / 2)
+        x0 = min(max(x0, 0), w - side)
+        y0 = min(max(y0, 0), h - side)
+        return x0, y0, side
+
+    def processRoi(self, img, roi):
+        """
+        Run the backend on a downscaled crop and map the landmarks back to full-frame coordinates
+        """
+        h, w, c = img.shape
+        x0, y0, side = roi
+        detections = self.runInference(self.toRGB(img[y0:y0 + side, x0:x0 + side], self.roiSize))
+        scale = np.array((side / w, side / h, side / w), dtype=np.float32)
+        offset = np.array((x0 / w, y0 / h, 0.0), dtype=np.float32)
+        return [(lm * scale + offset, label, score) for lm, label, score in detections]
 
-    def findHands(self, img, draw=True, flipType=True):
+    def findHands(self, img, draw=True, flipType=True, timestamp=None):
         """
-        Enhanced hand detection with smoothing
+        Enhanced hand detection with per-hand landmark filtering.
+        timestamp (seconds) drives the filters, e.g. the position in a video; defaults to the clock.
+        With trackROI enabled only a downscaled crop around the last hands is processed;
+        a backend that does its own tracking gets the full frame downscaled to trackedWidth.
+        Returns a list of Hand objects and the image.
         """
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+        h, w, c = img.shape
+        useRoi = self.trackROI and not self.backend.own_tracking
+        roi = self.trackingRoi(w, h) if useRoi else None
+        if roi is not None:
+            detections = self.processRoi(img, roi)
+            self.roiFrames += 1
+            if not detections:
+                # Hand lost, fall back to a full-frame search
+                roi = None
+
+        if roi is None:
+            # Landmarks are normalized, so a downscaled full frame needs no mapping back
+            downscale = self.trackROI and self.backend.own_tracking and w > self.trackedWidth
+            size = (self.trackedWidth, round(h * self.trackedWidth / w)) if downscale else None
+            detections = self.runInference(self.toRGB(img, size))
+            self.roiFrames = 0
 
         allHands = []
-        h, w, c = img.shape
-        if self.results.multi_hand_landmarks:
-            for handType, handLms in zip(self.results.multi_handedness, self.results.multi_hand_landmarks):
-                myHand = {}
-                mylmList = []
-                xList = []
-                yList = []
-
-                # Apply smoothing to landmarks
-                if self.prev_landmarks is not None:
-                    for i, lm in enumerate(handLms.landmark):
-                        prev_lm = self.prev_landmarks[i]
-                        lm.x = prev_lm[0] * self.smoothening + lm.x * (1 - self.smoothening)
-                        lm.y = prev_lm[1] * self.smoothening + lm.y * (1 - self.smoothening)
-                        lm.z = prev_lm[2] * self.smoothening + lm.z * (1 - self.smoothening)
-
-                # Store current landmarks for next frame
-                self.prev_landmarks = [(lm.x, lm.y, lm.z) for lm in handLms.landmark]
-
-                # Process landmarks with improved precision
-                for id, lm in enumerate(handLms.landmark):
-                    px, py, pz = float(lm.x * w), float(lm.y * h), float(lm.z * w)
-                    mylmList.append([int(px), int(py), pz])
-                    xList.append(px)
-                    yList.append(py)
-
-                # Calculate bounding box with padding
-                xmin, xmax = min(xList), max(xList)
-                ymin, ymax = min(yList), max(yList)
-                boxW, boxH = xmax - xmin, ymax - ymin
-                bbox = xmin - 20, ymin - 20, boxW + 40, boxH + 40
-                cx, cy = bbox[0] + (bbox[2] // 2), bbox[1] + (bbox[3] // 2)
-
-                myHand["lmList"] = mylmList
-                myHand["bbox"] = bbox
-                myHand["center"] = (int(cx), int(cy))
-                myHand["confidence"] = handType.classification[0].score
-
-                # Set hand type before using it
-                if flipType:
-                    if handType.classification[0].label == "Right":
-                        myHand["type"] = "Left"
-                    else:
-                        myHand["type"] = "Right"
-                else:
-                    myHand["type"] = handType.classification[0].label
-
-                # Only include hands with high confidence
-                if myHand["confidence"] > 0.8:
-                    allHands.append(myHand)
-
-                # Only draw if we have a valid hand and draw is enabled
-                if draw and "type" in myHand:
-                    self.mpDraw.draw_landmarks(img, handLms, self.mpHands.HAND_CONNECTIONS,
-                                               self.mpDraw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                                               self.mpDraw.DrawingSpec(color=(0, 0, 255), thickness=2))
-
-                    cv2.rectangle(img, (int(bbox[0]), int(bbox[1])),
-                                  (int(bbox[0] + bbox[2]), int(bbox[1] + bbox[3])),
-                                  (0, 255, 0), 2)
-
-                    cv2.putText(img, f"{myHand['type']} ({myHand['confidence']:.2f})",
-                                (int(bbox[0]), int(bbox[1] - 30)),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        now = time.perf_counter() if timestamp is None else timestamp
+        scale = np.array((w, h, w), dtype=np.float32)
 
-        return allHands, img
+        # Match detections to tracks by bbox center and handedness
+        centers = [(lm[:, :2].min(axis=0) + lm[:, :2].max(axis=0)) / 2 * scale[:2] for lm, _, _ in detections]
+        tracks = self.tracker.update(centers, [label for _, label, _ in detections])
 
-    def fingersUp(self, myHand):
-        """
-        Enhanced finger detection with improved angle calculation
-        """
-        fingers = []
-        myHandType = myHand["type"]
-        myLmList = myHand["lmList"]
+        for (lm, label, score), track in zip(detections, tracks):
+            # Filter landmarks per track so two hands never blend
+            lm = self.landmarkFilter.filter(track.id, lm, now)
 
-        def calculate_angle(a, b, c):
-            a = np.array([myLmList[a][0], myLmList[a][1]])
-            b = np.array([myLmList[b][0], myLmList[b][1]])
-            c = np.array([myLmList[c][0], myLmList[c][1]])
+            # Set hand type before using it
+            if flipType:
+                handType = "Left" if label == "Right" else "Right"
+            else:
+                handType = label
 
-            ba = a - b
-            bc = c - b
+            myHand = Hand(lm * scale, handType, score, track_id=track.id, track_age=track.age)
 
-            cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-            angle = np.arccos(cosine_angle)
+            # Only include hands with high confidence
+            if myHand.confidence > 0.8:
+                allHands.append(myHand)
 
-            return np.degrees(angle)
+            if draw:
+                self.drawHand(img, myHand)
 
-        # Improved thumb detection using angle
-        if myHandType == "Right":
-            angle = calculate_angle(4, 3, 2)
-            fingers.append(1 if angle > 150 else 0)
-        else:
-            angle = calculate_angle(4, 3, 2)
-            fingers.append(1 if angle > 150 else 0)
+        self.landmarkFilter.prune(now)
+        if useRoi:
+            self.lastBbox = self.unionBbox(allHands)
+
+        return allHands, img
 
-        # Improved finger detection using angles
-        for id in range(1, 5):
-            angle = calculate_angle(self.tipIds[id], self.tipIds[id] - 2, self.tipIds[id] - 3)
-            fingers.append(1 if angle > 160 else 0)
+    def drawHand(self, img, hand):
+        """Draw landmarks, connections, bounding box and label of a hand"""
+        draw_hand(img, hand)
 
-        return fingers
+    def unionBbox(self, hands):
+        """Bounding box (x, y, w, h) covering all hands, or None"""
+        if not hands:
+            return None
+        xmin = min(hand.bbox[0] for hand in hands)
+        ymin = min(hand.bbox[1] for hand in hands)
+        xmax = max(hand.bbox[0] + hand.bbox[2] for hand in hands)
+        ymax = max(hand.bbox[1] + hand.bbox[3] for hand in hands)
+        return xmin, ymin, xmax - xmin, ymax - ymin
+
+    def fingersUp(self, myHand):
+        """
+        Enhanced finger detection with improved angle calculation.
+        All five joint angles are computed in one vectorized call, see utils.finger_state.
+        """
+        if isinstance(myHand, Hand):
+            landmarks = myHand.pixels
+        else:
+            landmarks = np.array(myHand["lmList"])[:, :2]
+        return finger_states(landmarks, self.thumbAngle, self.fingerAngle).tolist()
 
     def findDistance(self, p1, p2, img=None, color=(255, 0, 255), scale=5):
         """
@@ -0,0 +1,20 @@
+import os
+import json
+
+import numpy as np
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to a temporary file and rename it, so readers never see a partial file"""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def save_npy_atomic(path, array):
+    """np.save through a temporary file and a rename, like write_json_atomic"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
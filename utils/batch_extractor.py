@@ -0,0 +1,285 @@
+"""
+Batch landmark extraction for building training datasets.
+
+Videos are spread over a process pool with one HandDetector per worker.
+Every video gets its own directory of chunk files:
+
+    <output>/<video>-<hash>/chunk_00000.records.npy    frame, timestamp, handedness, confidence, track_id
+    <output>/<video>-<hash>/chunk_00000.landmarks.npy  (N, 21, 3) float16, normalized like MediaPipe
+
+Landmarks are stored as float16 normalized coordinates (half the size of
+float32) in plain .npy files, so chunks can be opened with mmap_mode="r"
+instead of being decompressed. Each video directory has a progress.json
+that lists finished chunks; an interrupted run picks up after the last
+finished chunk.
+
+    python -m utils.batch_extractor recordings/ --output dataset/ --workers 4
+"""
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import logging
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+from utils.atomic_files import save_npy_atomic, write_json_atomic
+
+RECORD_DTYPE = np.dtype([
+    ('frame', np.int64),
+    ('timestamp', np.float64),    # Seconds from the start of the video
+    ('handedness', np.int8),      # 0 = Left, 1 = Right (after flipType)
+    ('confidence', np.float32),
+    ('track_id', np.int32),
+])
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# One detector per worker process, created by _init_worker
+_detector = None
+
+
+def video_dir_name(video_path):
+    """Stable directory name for a video: file stem plus a hash of its absolute path"""
+    digest = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()[:8]
+    return f"{os.path.splitext(os.path.basename(video_path))[0]}-{digest}"
+
+
+def find_videos(paths):
+    """Expand directories into the video files they contain"""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for ext in VIDEO_EXTENSIONS:
+                videos.extend(glob.glob(os.path.join(path, "**", f"*{ext}"), recursive=True))
+        else:
+            videos.append(path)
+    return sorted(set(videos))
+
+
+def load_progress(video_dir, video_path):
+    path = os.path.join(video_dir, "progress.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"video": os.path.abspath(video_path), "next_frame": 0, "frames": 0, "seconds": 0.0,
+            "chunks": [], "done": False}
+
+
+def _init_worker(detector_kwargs):
+    global _detector
+    from utils.debug_helper import setup_environment
+    setup_environment()
+    from utils._Digita import HandDetector
+    _detector = HandDetector(**detector_kwargs)
+
+
+class ChunkWriter:
+    """Buffers hands of one video and writes them out chunk by chunk"""
+    def __init__(self, video_dir, progress, chunk_size, max_hands):
+        self.video_dir = video_dir
+        self.progress = progress
+        self.chunk_size = chunk_size
+        # Chunks are only cut between frames, so leave room for the hands of one more frame
+        self.records = np.zeros(chunk_size + max_hands, dtype=RECORD_DTYPE)
+        self.landmarks = np.zeros((chunk_size + max_hands, 21, 3), dtype=np.float16)
+        self.count = 0
+
+    def add(self, frame, timestamp, hand, scale):
+        record = self.records[self.count]
+        record['frame'] = frame
+        record['timestamp'] = timestamp
+        record['handedness'] = 1 if hand.type == "Right" else 0
+        record['confidence'] = hand.confidence
+        record['track_id'] = -1 if hand.track_id is None else hand.track_id
+        self.landmarks[self.count] = hand.landmarks / scale
+        self.count += 1
+
+    def full(self):
+        return self.count >= self.chunk_size
+
+    def flush(self, next_frame, frames, seconds):
+        """Write the buffered hands and mark every frame before next_frame as done"""
+        if self.count:
+            name = f"chunk_{len(self.progress['chunks']):05d}"
+            base = os.path.join(self.video_dir, name)
+            save_npy_atomic(base + ".landmarks.npy", self.landmarks[:self.count])
+            save_npy_atomic(base + ".records.npy", self.records[:self.count])
+            self.progress["chunks"].append({
+                "name": name,
+                "hands": self.count,
+                "first_frame": int(self.records['frame'][0]),
+                "last_frame": int(self.records['frame'][self.count - 1]),
+            })
+            self.count = 0
+        self.progress["next_frame"] = next_frame
+        self.progress["frames"] = frames
+        self.progress["seconds"] = seconds
+        write_json_atomic(os.path.join(self.video_dir, "progress.json"), self.progress)
+
+
+def extract_video(job):
+    """Worker task: detect hands in every frame of one video, resuming after the last finished chunk"""
+    import cv2
+
+    video_path, output_dir, chunk_size, flip = job
+    logger = logging.getLogger('gesture_app')
+    video_dir = os.path.join(output_dir, video_dir_name(video_path))
+    os.makedirs(video_dir, exist_ok=True)
+    progress = load_progress(video_dir, video_path)
+    result = {"video": video_path, "dir": os.path.basename(video_dir), "worker": os.getpid()}
+
+    if progress["done"]:
+        return dict(result, skipped=True, frames=progress["frames"], seconds=progress["seconds"],
+                    hands=sum(chunk["hands"] for chunk in progress["chunks"]))
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.error(f"Could not open video {video_path}")
+        return dict(result, error="could not open video", frames=0, seconds=0.0, hands=0)
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame = progress["next_frame"]
+    if frame:
+        # Hands of unfinished chunks were never written, redo them from the last checkpoint
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
+    # The worker's detector is shared by all its videos, nothing may carry over from the last one
+    _detector.reset()
+
+    writer = ChunkWriter(video_dir, progress, chunk_size, _detector.maxHands)
+    frames, seconds = progress["frames"], progress["seconds"]
+    new_frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            success, img = cap.read()
+            if not success:
+                break
+            if flip:
+                img = cv2.flip(img, 1)
+            h, w = img.shape[:2]
+            # Filters use the video clock, not how fast the worker happens to run
+            hands, _ = _detector.findHands(img, draw=False, timestamp=frame / fps)
+
+            scale = np.array((w, h, w), dtype=np.float32)
+            for hand in hands:
+                writer.add(frame, frame / fps, hand, scale)
+            frame += 1
+            new_frames += 1
+            if writer.full():
+                writer.flush(frame, frames + new_frames, seconds + time.perf_counter() - start)
+    finally:
+        cap.release()
+
+    elapsed = time.perf_counter() - start
+    progress["done"] = True
+    writer.flush(frame, frames + new_frames, seconds + elapsed)
+    return dict(result, skipped=False, frames=new_frames, seconds=elapsed,
+                hands=sum(chunk["hands"] for chunk in progress["chunks"]))
+
+
+def run(videos, output_dir, workers=None, chunk_size=4096, flip=True, detector_kwargs=None):
+    """Extract landmarks of all videos with a process pool; returns per-video and per-worker stats"""
+    logger = logging.getLogger('gesture_app')
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    detector_kwargs = dict({"staticMode": False, "maxHands": 2, "detectionCon": 0.5, "minTrackCon": 0.5},
+                           **(detector_kwargs or {}))
+
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    manifest = {"version": 1, "record_dtype": RECORD_DTYPE.descr, "landmarks_dtype": "float16",
+                "detector": detector_kwargs, "flip": flip, "videos": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest["videos"] = json.load(f).get("videos", {})
+
+    jobs = [(video, output_dir, chunk_size, flip) for video in videos]
+    per_worker = {}
+    results = []
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(detector_kwargs,)) as pool:
+        for result in pool.imap_unordered(extract_video, jobs):
+            results.append(result)
+            if result.get("skipped"):
+                logger.info(f"{result['video']}: already extracted, skipped")
+            elif "error" not in result:
+                fps = result["frames"] / result["seconds"] if result["seconds"] > 0 else 0.0
+                logger.info(f"{result['video']}: {result['frames']} frames, {result['hands']} hands, "
+                            f"{fps:.1f} fps on worker {result['worker']}")
+                stats = per_worker.setdefault(result["worker"], {"videos": 0, "frames": 0, "seconds": 0.0})
+                stats["videos"] += 1
+                stats["frames"] += result["frames"]
+                stats["seconds"] += result["seconds"]
+
+            if "error" not in result:
+                manifest["videos"][result["dir"]] = {"video": os.path.abspath(result["video"]),
+                                                     "hands": result["hands"]}
+                write_json_atomic(manifest_path, manifest)
+
+    for stats in per_worker.values():
+        stats["fps"] = stats["frames"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return {"videos": results, "workers": per_worker}
+
+
+def iter_chunks(output_dir, mmap_mode="r"):
+    """Yield (video dir, records, landmarks) for every finished chunk, memory-mapped by default"""
+    with open(os.path.join(output_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    for name in sorted(manifest["videos"]):
+        video_dir = os.path.join(output_dir, name)
+        progress = load_progress(video_dir, name)
+        for chunk in progress["chunks"]:
+            base = os.path.join(video_dir, chunk["name"])
+            yield (name,
+                   np.load(base + ".records.npy", mmap_mode=mmap_mode),
+                   np.load(base + ".landmarks.npy", mmap_mode=mmap_mode))
+
+
+def load_dataset(output_dir):
+    """All records and landmarks of a dataset, concatenated into memory"""
+    records, landmarks = [], []
+    for _, rec, lm in iter_chunks(output_dir):
+        records.append(rec)
+        landmarks.append(lm)
+    if not records:
+        return np.zeros(0, dtype=RECORD_DTYPE), np.zeros((0, 21, 3), dtype=np.float16)
+    return np.concatenate(records), np.concatenate(landmarks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from recorded videos into a dataset")
+    parser.add_argument("inputs", nargs="+", help="Video files or directories containing videos")
+    parser.add_argument("--output", required=True, help="Dataset directory")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count - 1)")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Hands per chunk file")
+    parser.add_argument("--max-hands", type=int, default=2)
+    parser.add_argument("--backend", default="mediapipe", choices=["mediapipe", "quantized", "synthetic"])
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1])
+    parser.add_argument("--model-path", help="ONNX or TFLite file for the quantized backend")
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror frames like the live camera path")
+    args = parser.parse_args()
+
+    from utils.debug_helper import setup_environment, setup_logging
+    setup_environment()
+    setup_logging()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("No videos found", file=sys.stderr)
+        sys.exit(1)
+
+    summary = run(videos, args.output, args.workers, args.chunk_size, flip=not args.no_flip,
+                  detector_kwargs={"maxHands": args.max_hands, "backend": args.backend,
+                                   "modelComplexity": args.model_complexity, "modelPath": args.model_path})
+    for pid, stats in summary["workers"].items():
+        print(f"worker {pid}: {stats['videos']} videos, {stats['frames']} frames, {stats['fps']:.1f} fps",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run from the project root: python -m utils.batch_extractor recordings/ --output dataset/
+    main()
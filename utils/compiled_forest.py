@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import argparse
+from importlib.metadata import version
+import shutil
+import tempfile
+
+import numpy as np
+
+# Flat node arrays of all trees, one .npy file each
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+class CompiledForest:
+    """
+    Random forest classifier as flat numpy node arrays, evaluated without scikit-learn.
+
+    All trees share one set of arrays: split feature and threshold, left and
+    right child (absolute node indices) and per-node class probabilities.
+    Leaves point to themselves, so every sample can simply take max_depth
+    steps, which keeps the traversal fully vectorized over samples and trees.
+    The arrays are stored as .npy files and memory-mapped on load.
+    """
+    def __init__(self, arrays, meta):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.meta = meta
+        self.classes = np.array(meta["classes"])
+        self.max_depth = meta["max_depth"]
+        self.n_features = meta["n_features"]
+
+    @classmethod
+    def from_sklearn(cls, model, config_hash=None):
+        """Flatten a fitted RandomForestClassifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, own, tree.children_left + offset))
+            rights.append(np.where(leaf, own, tree.children_right + offset))
+
+            # Class fractions per node, like DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            values.append(value / np.where(totals == 0, 1.0, totals))
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        arrays = {
+            "feature": np.concatenate(features).astype(np.int32),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "left": np.concatenate(lefts).astype(np.int32),
+            "right": np.concatenate(rights).astype(np.int32),
+            "value": np.concatenate(values),
+            "roots": np.array(roots, dtype=np.int32),
+        }
+        meta = {
+            "format": 1,
+            "classes": [int(c) for c in model.classes_],
+            "n_trees": len(model.estimators_),
+            "n_features": int(model.n_features_in_),
+            "max_depth": int(max_depth),
+            "config_hash": config_hash,
+            "sklearn": version("scikit-learn"),  # Lets a runtime without scikit-learn rebuild the hash
+        }
+        return cls(arrays, meta)
+
+    def predict_proba(self, X):
+        """Class probabilities for a batch (n, n_features) or a single row (n_features,)"""
+        X = np.asarray(X)
+        single = X.ndim == 1
+        # scikit-learn compares float32 features against float64 thresholds
+        X = np.atleast_2d(X).astype(np.float32).astype(np.float64)
+
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        proba = self.value[node].mean(axis=1)
+        return proba[0] if single else proba
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=-1)]
+
+    def check_parity(self, model, X, atol=1e-9):
+        """Max difference to the scikit-learn forest's predict_proba on X; raises if above atol"""
+        expected = model.predict_proba(X)
+        diff = float(np.abs(self.predict_proba(X) - expected).max())
+        if diff > atol:
+            raise ValueError(f"Compiled forest differs from scikit-learn by {diff:.3g}")
+        return diff
+
+    def save(self, directory):
+        """Write the arrays and metadata into directory, replacing it atomically"""
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".forest-", dir=parent)
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(self.meta, f, indent=2)
+
+            # Directories cannot be replaced in one step when the target exists, swap them
+            old = None
+            if os.path.exists(directory):
+                old = tmp + ".old"
+                os.replace(directory, old)
+            os.replace(tmp, directory)
+            if old is not None:
+                shutil.rmtree(old, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def read_meta(directory):
+        """Metadata of a saved forest without opening its arrays"""
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open a saved forest; arrays are memory-mapped unless mmap is False"""
+        meta = cls.read_meta(directory)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in ARRAYS}
+        return cls(arrays, meta)
+
+
+def export_forest(model, directory, X_check, config_hash=None):
+    """
+    Compile a fitted forest, verify it against predict_proba on X_check and save it.
+    Returns the compiled forest; nothing is written if the parity check fails.
+    """
+    forest = CompiledForest.from_sklearn(model, config_hash)
+    forest.check_parity(model, X_check)
+    forest.save(directory)
+    return forest
+
+
+def main():
+    from utils.ml_gesture_recognizer import MLGestureRecognizer, DEFAULT_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Check the compiled gesture forest against scikit-learn")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Pickled model, compiled forest next to it")
+    args = parser.parse_args()
+
+    recognizer = MLGestureRecognizer(args.model)
+    try:
+        diff = recognizer.check_compiled()
+    except ValueError as e:
+        print(f"Parity check failed: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Compiled forest matches scikit-learn, max difference {diff:.3g}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run from the project root: python -m utils.compiled_forest
+    main()
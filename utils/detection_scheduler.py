@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+from utils.hand import Hand
+
+
+class DetectionScheduler:
+    """
+    Motion-adaptive wrapper around HandDetector.findHands.
+
+    While the hand is nearly still, inference is skipped and the landmarks are
+    extrapolated from the velocity measured between the last two inferences.
+    Velocities are matched per track ID, so two hands never swap motion.
+    Every frame still returns hands, so drawing strokes stay continuous.
+    """
+    def __init__(self, detector, max_skip=2, motion_threshold=6.0):
+        self.detector = detector
+        self.max_skip = max_skip                  # Frames in a row that may be predicted
+        self.motion_threshold = motion_threshold  # Max landmark speed (px/frame) that allows skipping
+
+        self.last_hands = []
+        self.last_landmarks = {}   # track id -> (21, 3) landmarks of the last inference
+        self.velocities = {}       # track id -> (21, 3) per-frame velocities
+        self.frames_since_inference = 0
+        self.motion = float("inf")
+
+        # Counters
+        self.inferences = 0
+        self.skipped = 0
+
+    def shouldInfer(self):
+        """Decide whether the current frame needs a real inference"""
+        if not self.last_hands or any(hand.track_id not in self.velocities for hand in self.last_hands):
+            return True
+        if self.frames_since_inference >= self.max_skip:
+            return True
+        return self.motion > self.motion_threshold
+
+    def findHands(self, img, draw=True, flipType=True, timestamp=None):
+        """Same contract as HandDetector.findHands, timestamp is passed on to the detector's filters"""
+        if not self.shouldInfer():
+            self.frames_since_inference += 1
+            self.skipped += 1
+            hands = self.extrapolate(self.frames_since_inference)
+            if draw:
+                self.drawPrediction(img, hands)
+            return hands, img
+
+        hands, img = self.detector.findHands(img, draw=draw, flipType=flipType, timestamp=timestamp)
+        self.inferences += 1
+        self.updateMotion(hands, self.frames_since_inference + 1)
+        self.frames_since_inference = 0
+        return hands, img
+
+    def updateMotion(self, hands, frames):
+        """Measure landmark velocities between this inference and the previous one"""
+        landmarks = {hand.track_id: hand.landmarks for hand in hands}
+        if None not in landmarks and landmarks.keys() == self.last_landmarks.keys():
+            self.velocities = {tid: (lm - self.last_landmarks[tid]) / frames for tid, lm in landmarks.items()}
+            self.motion = max((float(np.abs(v[:, :2]).max()) for v in self.velocities.values()), default=0.0)
+        else:
+            # Tracks appeared or disappeared, velocities are meaningless
+            self.velocities = {}
+            self.motion = float("inf")
+
+        self.last_hands = hands
+        self.last_landmarks = landmarks
+
+    def extrapolate(self, frames):
+        """Predict hands `frames` frames after the last inference"""
+        predicted = []
+        for hand in self.last_hands:
+            lm = self.last_landmarks[hand.track_id] + self.velocities[hand.track_id] * frames
+            predicted.append(Hand(lm, hand.type, hand.confidence, predicted=True,
+                                  track_id=hand.track_id, track_age=hand.track_age + frames))
+        return predicted
+
+    def drawPrediction(self, img, hands):
+        """Light overlay for predicted frames"""
+        for hand in hands:
+            for point in hand.pixels.tolist():
+                cv2.circle(img, tuple(point), 2, (0, 0, 255), cv2.FILLED)
+
+    def get_stats(self):
+        """Return inference and skip counters"""
+        total = self.inferences + self.skipped
+        return {
+            "inferences": self.inferences,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+        }
@@ -0,0 +1,142 @@
+import os
+import time
+import tempfile
+
+import numpy as np
+
+
+class DistilledMLP:
+    """
+    One-hidden-layer MLP evaluated in plain numpy, trained to mimic the gesture forest.
+
+    Inputs are standardized with the statistics of the distillation set, the
+    hidden layer uses ReLU and the output is a softmax over the forest's classes.
+    """
+    def __init__(self, mean, std, W1, b1, W2, b2, config_hash=None):
+        self.mean = mean.astype(np.float32)
+        self.inv_std = (1.0 / std).astype(np.float32)
+        self.W1 = W1.astype(np.float32)
+        self.b1 = b1.astype(np.float32)
+        self.W2 = W2.astype(np.float32)
+        self.b2 = b2.astype(np.float32)
+        self.config_hash = config_hash
+
+    def predict_proba(self, X):
+        """Class probabilities for a batch (n, n_features) or a single row (n_features,)"""
+        x = (np.asarray(X, dtype=np.float32) - self.mean) * self.inv_std
+        h = x @ self.W1 + self.b1
+        np.maximum(h, 0, out=h)
+        logits = h @ self.W2 + self.b2
+        logits -= logits.max(axis=-1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=-1, keepdims=True)
+
+    def save(self, path):
+        """Write the weights to an .npz file atomically"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".distilled-", suffix=".npz", dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, mean=self.mean, inv_std=self.inv_std, W1=self.W1, b1=self.b1, W2=self.W2, b2=self.b2,
+                     config_hash=np.array(self.config_hash or ""))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["mean"], 1.0 / data["inv_std"], data["W1"], data["b1"], data["W2"], data["b2"],
+                       str(data["config_hash"]) or None)
+
+
+def distill(X, teacher_proba, hidden=32, epochs=400, lr=0.01, seed=0, config_hash=None):
+    """
+    Fit a DistilledMLP to the teacher's class probabilities (soft-label cross-entropy, full-batch Adam)
+    """
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float64)
+    Y = np.asarray(teacher_proba, dtype=np.float64)
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std < 1e-6] = 1.0
+    x = (X - mean) / std
+    n, n_features = x.shape
+    n_classes = Y.shape[1]
+
+    params = {
+        "W1": rng.normal(0, np.sqrt(2.0 / n_features), (n_features, hidden)),
+        "b1": np.zeros(hidden),
+        "W2": rng.normal(0, np.sqrt(1.0 / hidden), (hidden, n_classes)),
+        "b2": np.zeros(n_classes),
+    }
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(p) for k, p in params.items()}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for step in range(1, epochs + 1):
+        # Forward
+        h_pre = x @ params["W1"] + params["b1"]
+        h = np.maximum(h_pre, 0)
+        logits = h @ params["W2"] + params["b2"]
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+
+        # Backward of mean soft cross-entropy
+        d_logits = (p - Y) / n
+        grads = {
+            "W2": h.T @ d_logits,
+            "b2": d_logits.sum(axis=0),
+        }
+        d_h = (d_logits @ params["W2"].T) * (h_pre > 0)
+        grads["W1"] = x.T @ d_h
+        grads["b1"] = d_h.sum(axis=0)
+
+        for k in params:
+            m[k] = beta1 * m[k] + (1 - beta1) * grads[k]
+            v[k] = beta2 * v[k] + (1 - beta2) * grads[k] ** 2
+            m_hat = m[k] / (1 - beta1 ** step)
+            v_hat = v[k] / (1 - beta2 ** step)
+            params[k] -= lr * m_hat / (np.sqrt(v_hat) + eps)
+
+    return DistilledMLP(mean, std, params["W1"], params["b1"], params["W2"], params["b2"], config_hash)
+
+
+def _single_row_latency_us(predict_proba, X, repeats=200):
+    rows = X[np.arange(repeats) % len(X)]
+    timings = np.empty(repeats)
+    for i, row in enumerate(rows):
+        start = time.perf_counter_ns()
+        predict_proba(row)
+        timings[i] = time.perf_counter_ns() - start
+    return float(np.percentile(timings, 50) / 1000), float(np.percentile(timings, 95) / 1000)
+
+
+def compare_models(models, X, reference="forest"):
+    """
+    Accuracy against the reference model's predictions and single-row latency of each model.
+    models maps a name to a predict_proba callable that accepts one row or a batch.
+    """
+    X = np.asarray(X)
+    expected = np.argmax(models[reference](X), axis=1)
+    report = {}
+    for name, predict_proba in models.items():
+        start = time.perf_counter()
+        predicted = np.argmax(predict_proba(X), axis=1)
+        batch_ms = (time.perf_counter() - start) * 1000
+        p50, p95 = _single_row_latency_us(predict_proba, X)
+        report[name] = {
+            "agreement": float((predicted == expected).mean()),
+            "single_p50_us": p50,
+            "single_p95_us": p95,
+            "batch_ms": batch_ms,
+            "batch_size": len(X),
+        }
+    return report
+
+
+def format_report(report):
+    lines = [f"{'model':<12}{'agreement':>11}{'p50 us':>10}{'p95 us':>10}{'batch ms':>10}"]
+    for name, stats in report.items():
+        lines.append(f"{name:<12}{stats['agreement']:>11.4f}{stats['single_p50_us']:>10.1f}"
+                     f"{stats['single_p95_us']:>10.1f}{stats['batch_ms']:>10.2f}")
+    return "\n".join(lines)
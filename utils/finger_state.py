@@ -0,0 +1,42 @@
+import numpy as np
+
+# (tip, joint, base) landmark indices whose angle at `joint` decides if a finger is up
+# Thumb, Index, Middle, Ring, Pinky
+FINGER_JOINTS = np.array([
+    [4, 3, 2],
+    [8, 6, 5],
+    [12, 10, 9],
+    [16, 14, 13],
+    [20, 18, 17],
+])
+
+THUMB_ANGLE = 150   # Degrees above which the thumb counts as extended
+FINGER_ANGLE = 160  # Degrees above which the other fingers count as extended
+
+
+def joint_angles(landmarks):
+    """
+    Angle in degrees at the middle joint of each finger, computed in the image plane.
+    landmarks: (21, 2+) for one hand or (N, 21, 2+) for a batch; returns (5,) or (N, 5).
+    Degenerate joints (zero-length bones) give NaN.
+    """
+    lm = np.asarray(landmarks, dtype=np.float64)[..., :2]
+    a = lm[..., FINGER_JOINTS[:, 0], :]
+    b = lm[..., FINGER_JOINTS[:, 1], :]
+    c = lm[..., FINGER_JOINTS[:, 2], :]
+
+    ba = a - b
+    bc = c - b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine_angle = (ba * bc).sum(axis=-1) / (np.sqrt((ba * ba).sum(axis=-1)) * np.sqrt((bc * bc).sum(axis=-1)))
+        return np.degrees(np.arccos(cosine_angle))
+
+
+def finger_states(landmarks, thumb_angle=THUMB_ANGLE, finger_angle=FINGER_ANGLE):
+    """
+    1 for every extended finger, 0 otherwise, in Thumb..Pinky order.
+    Accepts one hand (21, 2+) or a batch (N, 21, 2+); returns int8 (5,) or (N, 5).
+    """
+    thresholds = np.array([thumb_angle, finger_angle, finger_angle, finger_angle, finger_angle])
+    with np.errstate(invalid='ignore'):
+        return (joint_angles(landmarks) > thresholds).astype(np.int8)
@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+
+from utils.frame_pool import FramePool
+
+
+class FrameRingBuffer:
+    """Small ring buffer that only keeps the newest captured frames"""
+    def __init__(self, size=2):
+        self.size = max(1, size)
+        self.frames = [None] * self.size
+        self.timestamps = [0.0] * self.size
+        self.seq = 0          # Sequence number of the newest frame
+        self.read_seq = 0     # Sequence number last handed to the consumer
+        self.dropped = 0      # Frames overwritten before anyone consumed them
+        self.cond = threading.Condition()
+
+    def push(self, frame, timestamp):
+        """Store a new frame, overwriting the oldest slot. Returns the overwritten frame, if any"""
+        with self.cond:
+            if self.seq > self.read_seq:
+                # The previous newest frame was never consumed
+                self.dropped += 1
+            self.seq += 1
+            slot = self.seq % self.size
+            evicted = self.frames[slot]
+            self.frames[slot] = frame
+            self.timestamps[slot] = timestamp
+            self.cond.notify_all()
+            return evicted
+
+    def latest(self, timeout=None):
+        """
+        Return (frame, timestamp, seq) of the newest unread frame, or (None, None, 0).
+        The frame leaves the buffer, so the producer can never overwrite it while it is in use.
+        """
+        with self.cond:
+            if self.seq == self.read_seq:
+                self.cond.wait(timeout)
+            if self.seq == self.read_seq:
+                return None, None, 0
+            slot = self.seq % self.size
+            self.read_seq = self.seq
+            frame = self.frames[slot]
+            self.frames[slot] = None
+            return frame, self.timestamps[slot], self.seq
+
+    def wake(self):
+        """Wake up a consumer blocked in latest()"""
+        with self.cond:
+            self.cond.notify_all()
+
+
+class CapturePipeline:
+    """
+    Producer/consumer capture stage.
+
+    A reader thread pulls frames from the camera as fast as the driver delivers
+    them and keeps only the newest ones in a ring buffer. An inference thread
+    always takes the newest frame, runs process_frame on it and publishes the
+    result. The GUI thread only polls latest_result(), so a slow detector can
+    never make frames pile up in the driver buffer.
+
+    With frame_shape set, the camera decodes into a pool of preallocated
+    buffers. process_frame must then not keep references to its input frame,
+    and release_result is called with every result the consumer is done with
+    (replaced before it was read, or superseded by the next latest_result()).
+    """
+    def __init__(self, cap, process_frame, buffer_size=2, stale_after=0.1, metrics=None,
+                 frame_shape=None, release_result=None):
+        self.logger = logging.getLogger('gesture_app')
+        self.cap = cap
+        self.metrics = metrics  # Optional FrameMetrics recorder
+        self.process_frame = process_frame
+        self.stale_after = stale_after  # seconds before a frame counts as stale
+        self.ring = FrameRingBuffer(buffer_size)
+        self.frame_shape = frame_shape
+        self.release_result = release_result
+        self.pool = None
+
+        self.running = False
+        self.capture_thread = None
+        self.inference_thread = None
+
+        # Result slot handed to the GUI
+        self.result_lock = threading.Lock()
+        self.result = None
+        self.result_seq = 0
+        self.result_read_seq = 0
+        self.result_timestamp = None
+        self.returned = None        # Result last handed to the consumer, released on the next call
+        self.last_timestamp = None  # Capture time of the result last returned by latest_result()
+
+        # Counters
+        self.captured = 0
+        self.read_failures = 0
+        self.processed = 0
+        self.stale = 0
+        self.process_errors = 0
+        self.start_time = None
+
+    def start(self):
+        """Start the reader and inference threads"""
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.perf_counter()
+        if self.frame_shape is not None:
+            # Ring slots, the frame being read and the frame being processed
+            self.pool = FramePool(self.frame_shape, self.ring.size + 2)
+        self.capture_thread = threading.Thread(target=self._capture_loop, name="CaptureThread", daemon=True)
+        self.inference_thread = threading.Thread(target=self._inference_loop, name="InferenceThread", daemon=True)
+        self.capture_thread.start()
+        self.inference_thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop both threads and wait for them to finish"""
+        if not self.running:
+            return
+        self.running = False
+        self.ring.wake()
+        for thread in (self.capture_thread, self.inference_thread):
+            if thread is not None:
+                thread.join(timeout)
+        self.capture_thread = None
+        self.inference_thread = None
+        self.logger.info(f"Capture pipeline stopped: {self.get_stats()}")
+
+    def _capture_loop(self):
+        while self.running:
+            start = time.perf_counter()
+            buf = self.pool.acquire() if self.pool is not None else None
+            try:
+                success, frame = self.cap.read(buf) if buf is not None else self.cap.read()
+            except Exception as e:
+                self.logger.error(f"Camera read error: {str(e)}")
+                success, frame = False, None
+
+            if frame is not buf:
+                # Driver delivered a different size, the pool buffer was not used
+                self._release_frame(buf)
+
+            if not success or frame is None:
+                self.read_failures += 1
+                time.sleep(0.005)
+                continue
+
+            self.captured += 1
+            now = time.perf_counter()
+            self._release_frame(self.ring.push(frame, now))
+            if self.metrics is not None:
+                self.metrics.record("capture", (now - start) * 1000)
+
+    def _inference_loop(self):
+        while self.running:
+            frame, timestamp, seq = self.ring.latest(timeout=0.1)
+            if frame is None:
+                continue
+
+            if time.perf_counter() - timestamp > self.stale_after:
+                self.stale += 1
+
+            try:
+                result = self.process_frame(frame)
+            except Exception as e:
+                self.process_errors += 1
+                self.logger.error(f"Frame processing error: {str(e)}")
+                continue
+            finally:
+                self._release_frame(frame)
+
+            self.processed += 1
+            with self.result_lock:
+                unread = self.result if self.result_seq != self.result_read_seq else None
+                self.result = result
+                self.result_seq = seq
+                self.result_timestamp = timestamp
+            self._release_result(unread)
+
+    def _release_frame(self, frame):
+        if self.pool is not None:
+            self.pool.release(frame)
+
+    def _release_result(self, result):
+        if result is not None and self.release_result is not None:
+            self.release_result(result)
+
+    def latest_result(self):
+        """Return the newest unread processing result, or None if nothing new arrived"""
+        with self.result_lock:
+            if self.result_seq == self.result_read_seq:
+                return None
+            self.result_read_seq = self.result_seq
+            self.last_timestamp = self.result_timestamp
+            previous, self.returned = self.returned, self.result
+        # The consumer has finished with the previous result once it asks for the next one
+        self._release_result(previous)
+        return self.returned
+
+    def get_stats(self):
+        """Return capture counters"""
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped": self.ring.dropped,
+            "stale": self.stale,
+            "read_failures": self.read_failures,
+            "process_errors": self.process_errors,
+            "capture_fps": self.captured / elapsed if elapsed > 0 else 0.0,
+            "process_fps": self.processed / elapsed if elapsed > 0 else 0.0,
+            "pool_misses": self.pool.misses if self.pool is not None else 0,
+        }
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+# Stages of one frame, in pipeline order
+FRAME_STAGES = (
+    "capture",
+    "color_conversion",
+    "inference",
+    "feature_extraction",
+    "classification",
+    "gesture_decision",
+    "annotation_rendering",
+    "preview_conversion",
+    "frame_total",
+)
+
+# Histogram bucket upper bounds in milliseconds (33 ms is one frame at 30 fps)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a rolling window for percentiles"""
+    def __init__(self, window=1024):
+        self.bucket_counts = [0] * (len(BUCKETS_MS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.window = np.zeros(window)
+        self.window_pos = 0
+
+    def observe(self, ms):
+        self.bucket_counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.window[self.window_pos % len(self.window)] = ms
+        self.window_pos += 1
+
+    def summary(self):
+        recent = self.window[:min(self.window_pos, len(self.window))]
+        if len(recent):
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        else:
+            p50 = p95 = p99 = 0.0
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.bucket_counts)),
+        }
+
+
+class FrameMetrics:
+    """
+    Per-stage frame latency recorder.
+
+    Stages call record() (or use the stage() context manager) with their
+    duration. Snapshots can be written periodically as JSON or Prometheus text
+    so frame-time regressions are visible on production machines.
+    """
+    def __init__(self, export_path=None, interval=10.0, window=1024):
+        self.logger = logging.getLogger('gesture_app')
+        self.export_path = export_path
+        self.interval = interval
+        self.window = window
+        self.histograms = {stage: LatencyHistogram(window) for stage in FRAME_STAGES}
+        self.lock = threading.Lock()
+        self.last_export = time.monotonic()
+
+    def record(self, stage, ms):
+        """Add one duration in milliseconds"""
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram(self.window)
+            histogram.observe(ms)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the body of a with-block as one stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self):
+        with self.lock:
+            stages = {name: hist.summary() for name, hist in self.histograms.items() if hist.count}
+        return {"timestamp": time.time(), "stages": stages}
+
+    def to_prometheus(self):
+        """Render all histograms in the Prometheus text exposition format"""
+        lines = [
+            "# HELP gesture_frame_stage_latency_ms Frame pipeline stage latency in milliseconds",
+            "# TYPE gesture_frame_stage_latency_ms histogram",
+        ]
+        with self.lock:
+            for name, hist in self.histograms.items():
+                if not hist.count:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS + ("+Inf",), hist.bucket_counts):
+                    cumulative += count
+                    lines.append(f'gesture_frame_stage_latency_ms_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'gesture_frame_stage_latency_ms_sum{{stage="{name}"}} {hist.total:.6f}')
+                lines.append(f'gesture_frame_stage_latency_ms_count{{stage="{name}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        """Write a snapshot atomically; the format follows the file extension (.prom or .json)"""
+        path = path or self.export_path
+        if not path:
+            return False
+        try:
+            if path.endswith(".prom"):
+                content = self.to_prometheus()
+            else:
+                content = json.dumps(self.snapshot(), indent=2)
+
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error exporting frame metrics: {str(e)}")
+            return False
+
+    def maybe_export(self):
+        """Export if the snapshot interval has passed; cheap enough to call every frame"""
+        now = time.monotonic()
+        if self.export_path and now - self.last_export >= self.interval:
+            self.last_export = now
+            self.export()
@@ -0,0 +1,58 @@
+import threading
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Fixed set of preallocated frame buffers.
+
+    Buffers are handed out with acquire() and given back with release(), so
+    every stage of the frame path writes into memory allocated once when the
+    camera starts. If all buffers are in use a fresh array is allocated and
+    counted as a miss instead of blocking the caller.
+    """
+    def __init__(self, shape, count, dtype=np.uint8):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.buffers = [np.empty(self.shape, dtype=self.dtype) for _ in range(count)]
+        self.owned = {id(buf) for buf in self.buffers}
+        self.free = list(self.buffers)
+        self.lock = threading.Lock()
+
+        # Counters
+        self.acquired = 0
+        self.misses = 0
+
+    def acquire(self):
+        """Return a free buffer of the pool shape (contents are undefined)"""
+        with self.lock:
+            self.acquired += 1
+            if self.free:
+                return self.free.pop()
+            self.misses += 1
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def release(self, buf):
+        """Give a buffer back; arrays that do not belong to the pool are ignored"""
+        if buf is None or id(buf) not in self.owned:
+            return
+        with self.lock:
+            if not any(buf is free for free in self.free):
+                self.free.append(buf)
+
+    def get_stats(self):
+        """Return pool usage counters"""
+        return {
+            "buffers": len(self.buffers),
+            "free": len(self.free),
+            "acquired": self.acquired,
+            "misses": self.misses,
+        }
+
+
+def reuse_buffer(buf, shape, dtype=np.uint8):
+    """Return buf if it already has the wanted shape, otherwise a new array to keep for next time"""
+    if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+        return np.empty(shape, dtype=dtype)
+    return buf
@@ -0,0 +1,66 @@
+import numpy as np
+
+from utils.finger_state import joint_angles, THUMB_ANGLE, FINGER_ANGLE
+
+# Keys of the gesture settings -> gesture names used by the recognizer and the events
+RULE_GESTURES = {
+    "prev_slide": "previous_slide",
+    "next_slide": "next_slide",
+    "pointer": "pointer",
+    "draw": "draw",
+    "erase": "erase",
+}
+
+
+class GestureCascade:
+    """
+    Rule-then-model gesture decision.
+
+    The finger-angle rule decides alone when every joint angle is at least
+    margin degrees away from its threshold; a clear pattern that matches no
+    gesture is "none". Only hands with a borderline joint go to the ML
+    recognizer. Every decision goes through the recognizer's smoother, rule
+    hits with full confidence, so a low-confidence model frame holds the
+    previous decision of either stage instead of flickering. Counters show how
+    often each stage made the decision.
+    """
+    def __init__(self, recognizer, thumb_angle=THUMB_ANGLE, finger_angle=FINGER_ANGLE, margin=8.0):
+        self.recognizer = recognizer
+        self.thresholds = np.array([thumb_angle, finger_angle, finger_angle, finger_angle, finger_angle])
+        self.margin = margin  # Degrees around a threshold in which the rule is not trusted
+        self.rule_hits = 0
+        self.model_calls = 0
+
+    def rule(self, landmarks, gestures):
+        """Finger states and the rule's gesture, None as gesture when a joint is borderline"""
+        angles = joint_angles(landmarks)
+        with np.errstate(invalid='ignore'):
+            fingers = (angles > self.thresholds).astype(np.int8).tolist()
+            clear = np.abs(angles - self.thresholds) >= self.margin  # NaN angles are never clear
+        if not clear.all():
+            return fingers, None
+        for key, pattern in gestures.items():
+            if fingers == list(pattern):
+                return fingers, RULE_GESTURES.get(key, key)
+        return fingers, "none"
+
+    def classify(self, hand, gestures):
+        """(fingers, gesture, stage) for one Hand, stage is "rule" or "model" """
+        fingers, gesture = self.rule(hand.landmarks, gestures)
+        if gesture is not None:
+            self.rule_hits += 1
+            return fingers, self.recognizer.smoother.update(gesture, 1.0), "rule"
+        self.model_calls += 1
+        gesture, confidence = self.recognizer.predict_raw(hand.lmList)
+        if confidence is not None:
+            gesture = self.recognizer.smoother.update(gesture, confidence)
+        return fingers, gesture, "model"
+
+    def get_stats(self):
+        """Return per-stage decision counters"""
+        total = self.rule_hits + self.model_calls
+        return {
+            "rule": self.rule_hits,
+            "model": self.model_calls,
+            "rule_ratio": self.rule_hits / total if total else 0.0,
+        }
@@ -0,0 +1,119 @@
+import logging
+
+from utils.hand import primary_hand
+from utils.stillness_gate import StillnessGate
+from utils.gesture_cascade import GestureCascade
+from utils.finger_state import THUMB_ANGLE, FINGER_ANGLE
+
+DEFAULT_GESTURES = {
+    "next_slide": [0, 0, 0, 0, 1],  # Pinky finger
+    "prev_slide": [1, 0, 0, 0, 0],  # Thumb
+    "pointer": [0, 1, 1, 0, 0],     # Index + Middle
+    "draw": [0, 1, 0, 0, 0],        # Index finger
+    "erase": [0, 1, 1, 1, 0]        # Index + Middle + Ring
+}
+
+
+class GestureDecider:
+    """
+    Qt-free gesture decision logic.
+
+    Decides the gesture with a GestureCascade (finger-angle rule first, the
+    ML prediction only for borderline joints) and turns it into events. The GUI, the replay engine and the
+    headless CLI all drive the presentation from the same events:
+
+        {"type": "previous_slide"} / {"type": "next_slide"}   (also from swipes, with "swipe": True)
+        {"type": "draw", "point": (x, y)} / {"type": "draw_end"}
+        {"type": "pointer", "point": (x, y)}
+        {"type": "erase"}
+    """
+    def __init__(self, detector, recognizer, gestures=None, threshold=600, cooldown=1.0, stillness=None,
+                 cascade=None):
+        self.logger = logging.getLogger('gesture_app')
+        self.detector = detector
+        self.recognizer = recognizer
+        self.gestures = dict(gestures or DEFAULT_GESTURES)
+        self.threshold = threshold      # Slide gestures only count above this line (pixels)
+        self.cooldown = cooldown        # Seconds between discrete gestures
+        # Skips finger states and ML prediction while the pose is unchanged
+        self.stillness = stillness if stillness is not None else StillnessGate()
+        # Same angle thresholds as the detector's fingersUp
+        self.cascade = cascade if cascade is not None else GestureCascade(
+            recognizer, getattr(detector, "thumbAngle", THUMB_ANGLE), getattr(detector, "fingerAngle", FINGER_ANGLE))
+
+        self.last_gesture_time = float("-inf")
+        self.last_processed_gesture = None
+        self.drawMode = False
+
+    def decide(self, hands, current_time, can_prev=True, can_next=True):
+        """
+        Decide what the current frame's hands mean.
+        Returns a dict with the finger states, the gesture, the stage that decided it
+        ("rule", "model" or "still" for a reused result) and the list of events.
+        """
+        if not hands:
+            self.recognizer.reset_history()
+            self.stillness.reset()
+            return {"fingers": None, "gesture": "none", "stage": None, "center": None, "events": self.idle()}
+
+        # The longest-tracked hand keeps control when a second hand enters the frame
+        hand = primary_hand(hands)
+        cx, cy = hand.center
+        lmList = hand.lmList
+        cached = self.stillness.lookup(hand.landmarks, hand.track_id)
+        if cached is None:
+            fingers, gesture, stage = self.cascade.classify(hand, self.gestures)
+            self.stillness.store((fingers, gesture))
+        else:
+            (fingers, gesture), stage = cached, "still"
+        swipe = self.recognizer.predict_dynamic(hand.landmarks, current_time, hand.track_id)
+        indexFinger = (int(lmList[8][0]), int(lmList[8][1]))
+        events = []
+
+        # Swipes work anywhere in the frame, but not while the hand is drawing or pointing
+        steering = gesture in ("draw", "pointer")
+        if swipe != "none" and not steering and (current_time - self.last_gesture_time) >= self.cooldown:
+            if (swipe == "previous_slide" and can_prev) or (swipe == "next_slide" and can_next):
+                events.append({"type": swipe, "swipe": True})
+                self.last_gesture_time = current_time
+                self.last_processed_gesture = swipe
+
+        # Discrete gestures only above the threshold line and after the cooldown
+        if cy <= self.threshold and (current_time - self.last_gesture_time) >= self.cooldown:
+            if gesture == "previous_slide":
+                if can_prev:
+                    events.append({"type": "previous_slide"})
+                    self.last_gesture_time = current_time
+                    self.last_processed_gesture = "previous_slide"
+
+            elif gesture == "next_slide":
+                if can_next:
+                    events.append({"type": "next_slide"})
+                    self.last_gesture_time = current_time
+                    self.last_processed_gesture = "next_slide"
+
+        # Continuous gestures (no cooldown)
+        if gesture == "draw":
+            self.drawMode = True
+            events.append({"type": "draw", "point": indexFinger})
+        else:
+            events.extend(self.idle())
+
+        if gesture == "pointer":
+            events.append({"type": "pointer", "point": indexFinger})
+
+        if gesture == "erase" and \
+           self.last_processed_gesture != "erase" and \
+           (current_time - self.last_gesture_time) >= self.cooldown:
+            events.append({"type": "erase"})
+            self.last_gesture_time = current_time
+            self.last_processed_gesture = "erase"
+
+        return {"fingers": fingers, "gesture": gesture, "stage": stage, "center": (cx, cy), "events": events}
+
+    def idle(self):
+        """Called when no hand is processed; ends a running stroke"""
+        if self.drawMode:
+            self.drawMode = False
+            return [{"type": "draw_end"}]
+        return []
@@ -0,0 +1,100 @@
+import numpy as np
+
+BBOX_PADDING = 20
+
+# Landmark index pairs forming the hand skeleton (same topology as MediaPipe Hands)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),           # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),           # Index
+    (5, 9), (9, 10), (10, 11), (11, 12),      # Middle
+    (9, 13), (13, 14), (14, 15), (15, 16),    # Ring
+    (13, 17), (17, 18), (18, 19), (19, 20),   # Pinky
+    (0, 17),                                  # Palm
+)
+
+
+class Hand:
+    """
+    One detected hand.
+
+    The 21 landmarks live in a single (21, 3) float32 array in pixel
+    coordinates (z is scaled by the frame width like x). Bounding box and
+    center are computed with vectorized ops. Item access (hand["lmList"],
+    hand["bbox"], ...) keeps code written for the old per-hand dicts working.
+    """
+    __slots__ = ("landmarks", "type", "confidence", "bbox", "center", "predicted",
+                 "track_id", "track_age", "_lmList")
+
+    KEYS = ("lmList", "bbox", "center", "type", "confidence", "track_id")
+
+    def __init__(self, landmarks, hand_type, confidence, predicted=False, track_id=None, track_age=0):
+        self.landmarks = np.asarray(landmarks, dtype=np.float32).reshape(21, 3)
+        self.type = hand_type
+        self.confidence = float(confidence)
+        self.predicted = predicted
+        self.track_id = track_id    # Persistent ID assigned by HandTracker
+        self.track_age = track_age  # Frames since the track was created
+        self._lmList = None
+
+        # Bounding box with padding, center in the middle of the padded box
+        mins = self.landmarks[:, :2].min(axis=0)
+        size = self.landmarks[:, :2].max(axis=0) - mins
+        xmin, ymin = float(mins[0]), float(mins[1])
+        boxW, boxH = float(size[0]), float(size[1])
+        self.bbox = (xmin - BBOX_PADDING, ymin - BBOX_PADDING,
+                     boxW + 2 * BBOX_PADDING, boxH + 2 * BBOX_PADDING)
+        self.center = (int(self.bbox[0] + (self.bbox[2] // 2)), int(self.bbox[1] + (self.bbox[3] // 2)))
+
+    @property
+    def pixels(self):
+        """(21, 2) int32 pixel positions, truncated like int()"""
+        return self.landmarks[:, :2].astype(np.int32)
+
+    @property
+    def lmList(self):
+        """Landmarks as [[x_px, y_px, z], ...] with integer x/y, built once on demand"""
+        if self._lmList is None:
+            xy = self.pixels.tolist()
+            z = self.landmarks[:, 2].tolist()
+            self._lmList = [[x, y, pz] for (x, y), pz in zip(xy, z)]
+        return self._lmList
+
+    # Compatibility view for the old dict-based hands
+
+    def __getitem__(self, key):
+        if key in Hand.KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in Hand.KEYS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in Hand.KEYS else default
+
+    def keys(self):
+        return Hand.KEYS
+
+    def to_dict(self):
+        """Plain JSON-friendly representation"""
+        return {
+            "landmarks": self.landmarks.tolist(),
+            "bbox": list(self.bbox),
+            "center": list(self.center),
+            "type": self.type,
+            "confidence": self.confidence,
+            "track_id": self.track_id,
+            "track_age": self.track_age,
+            "predicted": self.predicted,
+        }
+
+    def __repr__(self):
+        return (f"Hand(track_id={self.track_id}, type={self.type!r}, "
+                f"confidence={self.confidence:.2f}, center={self.center})")
+
+
+def primary_hand(hands):
+    """The hand whose track has existed longest, so the controlling hand does not flip between frames"""
+    if not hands:
+        return None
+    return max(hands, key=lambda hand: hand.track_age if isinstance(hand, Hand) else -1)
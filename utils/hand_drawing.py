@@ -0,0 +1,31 @@
+import cv2
+
+from utils.hand import HAND_CONNECTIONS
+
+
+def draw_hand(img, hand):
+    """Draw landmarks, connections, bounding box and label of a Hand onto a BGR image"""
+    points = hand.pixels.tolist()
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(img, tuple(points[start]), tuple(points[end]), (0, 0, 255), 2)
+    for point in points:
+        cv2.circle(img, tuple(point), 2, (0, 255, 0), 2)
+
+    bbox = hand.bbox
+    cv2.rectangle(img, (int(bbox[0]), int(bbox[1])),
+                  (int(bbox[0] + bbox[2]), int(bbox[1] + bbox[3])),
+                  (0, 255, 0), 2)
+
+    cv2.putText(img, f"{hand.type} ({hand.confidence:.2f})",
+                (int(bbox[0]), int(bbox[1] - 30)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+
+def draw_skeleton(canvas, hands):
+    """Draw the skeleton of each Hand in white with green joints, e.g. on the hand-only canvas"""
+    for hand in hands:
+        points = hand.pixels.tolist()
+        for start, end in HAND_CONNECTIONS:
+            cv2.line(canvas, tuple(points[start]), tuple(points[end]), (255, 255, 255), 2)
+        for point in points:
+            cv2.circle(canvas, tuple(point), 4, (0, 255, 0), -1)
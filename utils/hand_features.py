@@ -0,0 +1,79 @@
+import numpy as np
+
+# Joint chains from the wrist to each fingertip, Thumb..Pinky
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+
+# Wrist and fingertips; all pairwise distances between them are features
+KEY_POINTS = np.array([0, 4, 8, 12, 16, 20])
+_PAIR_A, _PAIR_B = np.triu_indices(len(KEY_POINTS), k=1)
+
+N_COORDS = 21 * 3
+N_DISTANCES = len(_PAIR_A)                 # 15
+N_ANGLES = FINGER_CHAINS.shape[0] * 3      # Bend at the three inner joints of each finger
+N_FEATURES = N_COORDS + N_DISTANCES + N_ANGLES
+
+
+def normalize_landmarks(landmarks):
+    """
+    Move the wrist to the origin, scale by palm size (wrist to middle finger base)
+    and rotate the palm to point up. landmarks: (21, 2+) or (N, 21, 2+), any units.
+    """
+    lm = np.asarray(landmarks, dtype=np.float32)
+    single = lm.ndim == 2
+    if single:
+        lm = lm[np.newaxis]
+    if lm.shape[-1] == 2:
+        lm = np.concatenate([lm, np.zeros(lm.shape[:-1] + (1,), dtype=np.float32)], axis=-1)
+    lm = lm[..., :3] - lm[:, :1, :3]
+
+    axis = lm[:, 9, :2]
+    size = np.hypot(axis[:, 0], axis[:, 1])
+    size[size < 1e-6] = 1.0
+    ux, uy = (axis / size[:, None]).T
+
+    # Rotate so the wrist -> middle finger base direction becomes (0, -1), the image "up"
+    x, y, z = lm[..., 0], lm[..., 1], lm[..., 2]
+    out = np.empty_like(lm)
+    out[..., 0] = -uy[:, None] * x + ux[:, None] * y
+    out[..., 1] = -ux[:, None] * x - uy[:, None] * y
+    out[..., 2] = z
+    out /= size[:, None, None]
+    return out[0] if single else out
+
+
+def extract_batch(landmarks):
+    """
+    (N, 21, 2+) landmarks -> (N, N_FEATURES) float32 features:
+    normalized coordinates, fingertip/wrist pairwise distances and joint bend angles
+    """
+    norm = normalize_landmarks(np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, np.shape(landmarks)[-1]))
+    n = len(norm)
+
+    key = norm[:, KEY_POINTS]
+    distances = np.linalg.norm(key[:, _PAIR_A] - key[:, _PAIR_B], axis=-1)
+
+    # Angle between the incoming and outgoing bone at each inner joint, 0 = straight, 1 = folded back
+    chain = norm[:, FINGER_CHAINS]                # (N, 5, 5, 3)
+    bones = chain[:, :, 1:] - chain[:, :, :-1]    # (N, 5, 4, 3)
+    incoming, outgoing = bones[:, :, :-1], bones[:, :, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine = (incoming * outgoing).sum(axis=-1) / (
+            np.linalg.norm(incoming, axis=-1) * np.linalg.norm(outgoing, axis=-1))
+    angles = np.arccos(np.clip(np.nan_to_num(cosine, nan=1.0), -1.0, 1.0)) / np.pi
+
+    return np.concatenate([norm.reshape(n, -1), distances, angles.reshape(n, -1)], axis=1).astype(np.float32)
+
+
+def extract(hand):
+    """Features of one hand: a Hand, an lmList or a (21, 2+) array -> (N_FEATURES,)"""
+    landmarks = hand.landmarks if hasattr(hand, "landmarks") else hand
+    lm = np.asarray(landmarks, dtype=np.float32)
+    if lm.shape[0] < 21:
+        raise ValueError(f"Expected 21 landmarks, got {lm.shape[0]}")
+    return extract_batch(lm[np.newaxis, :21])[0]
@@ -0,0 +1,104 @@
+import itertools
+
+import numpy as np
+
+
+class Track:
+    """State of one tracked hand"""
+    __slots__ = ("id", "center", "velocity", "label", "age", "missed")
+
+    def __init__(self, track_id, center, label):
+        self.id = track_id
+        self.center = center
+        self.velocity = np.zeros(2)
+        self.label = label
+        self.age = 0      # Frames since the track was created
+        self.missed = 0   # Consecutive frames without a matching detection
+
+    def predicted(self):
+        return self.center + self.velocity * (self.missed + 1)
+
+
+class HandTracker:
+    """
+    Assigns persistent IDs to hands across frames.
+
+    Detections are matched to existing tracks by minimum total cost, where the
+    cost is the distance between the bbox center and the track's predicted
+    center plus a penalty when the handedness differs. Tracks survive brief
+    dropouts of up to max_missed frames without losing their ID.
+    """
+    def __init__(self, max_distance=250.0, max_missed=10, handedness_cost=150.0):
+        self.max_distance = max_distance        # Pixels; farther detections start a new track
+        self.max_missed = max_missed
+        self.handedness_cost = handedness_cost  # Extra cost for matching a different hand label
+        self.tracks = []
+        self.next_id = 1
+
+    def cost_matrix(self, centers, labels):
+        """(tracks, detections) matching cost"""
+        predicted = np.array([track.predicted() for track in self.tracks]).reshape(-1, 1, 2)
+        cost = np.linalg.norm(predicted - np.asarray(centers, dtype=np.float64).reshape(1, -1, 2), axis=2)
+        track_labels = np.array([track.label for track in self.tracks]).reshape(-1, 1)
+        cost += (track_labels != np.array(labels).reshape(1, -1)) * self.handedness_cost
+        return cost
+
+    def assign(self, cost):
+        """Minimum-cost one-to-one matching; returns {track index: detection index}"""
+        n_tracks, n_dets = cost.shape
+        if n_tracks == 0 or n_dets == 0:
+            return {}
+
+        # Hand counts are tiny (maxHands), so exhaustive search is exact and cheap
+        best, best_cost = {}, float("inf")
+        if n_tracks <= n_dets:
+            for dets in itertools.permutations(range(n_dets), n_tracks):
+                pairs = {t: d for t, d in enumerate(dets) if cost[t, d] <= self.max_distance}
+                total = sum(cost[t, d] for t, d in pairs.items()) + (n_tracks - len(pairs)) * self.max_distance
+                if total < best_cost:
+                    best, best_cost = pairs, total
+        else:
+            for tracks in itertools.permutations(range(n_tracks), n_dets):
+                pairs = {t: d for d, t in enumerate(tracks) if cost[t, d] <= self.max_distance}
+                total = sum(cost[t, d] for t, d in pairs.items()) + (n_dets - len(pairs)) * self.max_distance
+                if total < best_cost:
+                    best, best_cost = pairs, total
+        return best
+
+    def update(self, centers, labels):
+        """
+        Match this frame's detections (bbox centers in pixels and handedness labels) to tracks.
+        Returns the matched Track for each detection, in detection order.
+        """
+        matches = self.assign(self.cost_matrix(centers, labels)) if centers else {}
+        result = [None] * len(centers)
+
+        for t, track in enumerate(self.tracks):
+            d = matches.get(t)
+            if d is None:
+                track.missed += 1
+            else:
+                center = np.asarray(centers[d], dtype=np.float64)
+                step = (center - track.center) / (track.missed + 1)
+                track.velocity = 0.5 * track.velocity + 0.5 * step
+                track.center = center
+                track.label = labels[d]
+                track.missed = 0
+                result[d] = track
+            track.age += 1
+
+        # Forget tracks that have been gone too long
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        # Unmatched detections start new tracks
+        for d, track in enumerate(result):
+            if track is None:
+                track = Track(self.next_id, np.asarray(centers[d], dtype=np.float64), labels[d])
+                self.next_id += 1
+                self.tracks.append(track)
+                result[d] = track
+        return result
+
+    def reset(self):
+        self.tracks = []
+        self.next_id = 1
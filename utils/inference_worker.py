@@ -0,0 +1,332 @@
+import math
+import time
+import struct
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.hand import Hand
+from utils.hand_drawing import draw_hand
+from utils.finger_state import finger_states
+
+# One detected hand as a fixed-size record, landmarks are in pixel coordinates
+HAND_RECORD_DTYPE = np.dtype([
+    ('landmarks', np.float32, (21, 3)),
+    ('confidence', np.float32),
+    ('handedness', np.int8),   # 0 = Left, 1 = Right (after flipType)
+    ('track_id', np.int32),    # Persistent HandTracker ID, -1 if untracked
+    ('track_age', np.int32),
+])
+
+HAND_TYPES = ("Left", "Right")
+
+# HandDetector stages timed in the worker and recorded into the parent's FrameMetrics
+WORKER_STAGES = ("color_conversion", "inference")
+
+# Request/response messages: slot index, sequence number, flipType and the filter timestamp
+# of the request (NaN for the worker's clock)
+_MESSAGE = struct.Struct("<iq?d")
+_STOP_SLOT = -1
+_READY_SLOT = -2  # Sent once by the worker when its detector is built
+
+
+def result_dtype(max_hands):
+    """Record layout for the detection result of one frame slot"""
+    return np.dtype([
+        ('seq', np.int64),
+        ('count', np.int32),
+        ('stage_ms', np.float32, (len(WORKER_STAGES),)),  # Milliseconds per WORKER_STAGES entry
+        ('hands', HAND_RECORD_DTYPE, (max_hands,)),
+    ])
+
+
+class _StageTimes:
+    """Stands in for FrameMetrics in the worker: sums the stage times of the current frame"""
+    def __init__(self):
+        self.times = dict.fromkeys(WORKER_STAGES, 0.0)
+
+    def record(self, stage, ms):
+        if stage in self.times:
+            self.times[stage] += ms
+
+    def pop(self):
+        times = [self.times[stage] for stage in WORKER_STAGES]
+        self.times = dict.fromkeys(WORKER_STAGES, 0.0)
+        return times
+
+
+def _worker_main(frame_shm_name, result_shm_name, shape, slots, max_hands,
+                 detector_kwargs, request_conn, response_conn):
+    """Entry point of the detection process"""
+    # Import here so the parent process never has to load MediaPipe
+    from utils._Digita import HandDetector
+
+    frame_shm = shared_memory.SharedMemory(name=frame_shm_name)
+    result_shm = shared_memory.SharedMemory(name=result_shm_name)
+    try:
+        frames = np.ndarray((slots,) + tuple(shape), dtype=np.uint8, buffer=frame_shm.buf)
+        results = np.ndarray((slots,), dtype=result_dtype(max_hands), buffer=result_shm.buf)
+        detector = HandDetector(**detector_kwargs)
+        detector.metrics = stage_times = _StageTimes()
+        response_conn.send_bytes(_MESSAGE.pack(_READY_SLOT, 0, False, math.nan))
+
+        while True:
+            slot, seq, flip_type, timestamp = _MESSAGE.unpack(request_conn.recv_bytes())
+            if slot == _STOP_SLOT:
+                break
+
+            try:
+                hands, _ = detector.findHands(frames[slot], draw=False, flipType=flip_type,
+                                              timestamp=None if math.isnan(timestamp) else timestamp)
+            except Exception:
+                hands = []
+
+            count = min(len(hands), max_hands)
+            slot_hands = results['hands'][slot]
+            for i in range(count):
+                slot_hands['landmarks'][i] = hands[i].landmarks
+                slot_hands['confidence'][i] = hands[i].confidence
+                slot_hands['handedness'][i] = 1 if hands[i].type == "Right" else 0
+                slot_hands['track_id'][i] = -1 if hands[i].track_id is None else hands[i].track_id
+                slot_hands['track_age'][i] = hands[i].track_age
+            results['count'][slot] = count
+            results['stage_ms'][slot] = stage_times.pop()
+            results['seq'][slot] = seq
+
+            response_conn.send_bytes(_MESSAGE.pack(slot, seq, flip_type, timestamp))
+    finally:
+        frame_shm.close()
+        result_shm.close()
+
+
+class HandInferenceProcess:
+    """
+    Runs HandDetector in a separate process.
+
+    Frames are copied into a preallocated shared-memory ring of BGR buffers and
+    results come back as fixed-size numpy records in a second shared block, so
+    nothing is pickled per frame. The interface mirrors HandDetector, so it can
+    be used as a drop-in replacement for detectorHand. start() waits until the
+    worker has built its detector, so the per-frame timeout never includes the
+    cold start. A worker that stops responding is restarted up to max_restarts
+    times; if it dies or cannot start, detection continues in-process.
+    """
+    def __init__(self, slots=3, maxHands=2, flipType=True, timeout=1.0, start_timeout=60.0, max_restarts=3,
+                 **detector_kwargs):
+        self.logger = logging.getLogger('gesture_app')
+        self.slots = slots
+        self.maxHands = maxHands
+        self.flipType = flipType
+        self.timeout = timeout                # Seconds to wait for one frame's result
+        self.start_timeout = start_timeout    # Seconds for spawning the worker and building its model
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.detector_kwargs = dict(detector_kwargs, maxHands=maxHands)
+
+        self.shape = None
+        self.process = None
+        self.frame_shm = None
+        self.result_shm = None
+        self.frames = None
+        self.results = None
+        self.request_conn = None
+        self.response_conn = None
+        self.free_slots = []
+        self.seq = 0
+        self.last_seq = 0
+        self.last_hands = []
+        self.fallback = None  # In-process HandDetector once the worker has died
+        self.metrics = None   # Optional FrameMetrics, gets the stage times measured in the worker
+        # Held while a frame is in flight, so a backend switch never tears down buffers in use
+        self.lock = threading.RLock()
+
+    def start(self, shape):
+        """
+        Allocate shared buffers for frames of the given shape, spawn the worker and wait
+        until its detector is ready; raises RuntimeError if it does not get there
+        """
+        with self.lock:
+            self.stop()
+            self.shape = tuple(shape)
+            frame_bytes = int(np.prod(self.shape)) * self.slots
+            rec_dtype = result_dtype(self.maxHands)
+
+            self.frame_shm = shared_memory.SharedMemory(create=True, size=frame_bytes)
+            self.result_shm = shared_memory.SharedMemory(create=True, size=rec_dtype.itemsize * self.slots)
+            self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self.frame_shm.buf)
+            self.results = np.ndarray((self.slots,), dtype=rec_dtype, buffer=self.result_shm.buf)
+            self.results['count'] = 0
+
+            started = time.perf_counter()
+            request_recv, self.request_conn = mp.Pipe(duplex=False)
+            self.response_conn, response_send = mp.Pipe(duplex=False)
+            self.process = mp.Process(
+                target=_worker_main,
+                args=(self.frame_shm.name, self.result_shm.name, self.shape, self.slots, self.maxHands,
+                      self.detector_kwargs, request_recv, response_send),
+                name="HandInferenceWorker",
+                daemon=True)
+            self.process.start()
+            request_recv.close()
+            response_send.close()
+
+            if not self.waitReady():
+                self.stop()
+                raise RuntimeError("Hand inference worker could not build its detector")
+            self.free_slots = list(range(self.slots))
+            self.logger.info(f"Hand inference worker started in {time.perf_counter() - started:.1f} s "
+                             f"(pid {self.process.pid}, {self.slots} slots of {self.shape})")
+
+    def waitReady(self):
+        """Wait for the worker's ready message; False if it died or took longer than start_timeout"""
+        deadline = time.perf_counter() + self.start_timeout
+        while self.process.is_alive():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            # Wake up regularly to notice a worker that crashed while importing
+            if self.response_conn.poll(min(remaining, 0.5)):
+                try:
+                    slot, _, _, _ = _MESSAGE.unpack(self.response_conn.recv_bytes())
+                except (EOFError, OSError):
+                    return False
+                return slot == _READY_SLOT
+        return False
+
+    def stop(self):
+        """Stop the worker and release the shared memory"""
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.request_conn.send_bytes(_MESSAGE.pack(_STOP_SLOT, 0, False, math.nan))
+                except (BrokenPipeError, OSError):
+                    pass
+                self.process.join(self.timeout)
+                if self.process.is_alive():
+                    self.process.terminate()
+                self.request_conn.close()
+                self.response_conn.close()
+                self.process = None
+
+            # Drop numpy views before closing the blocks
+            self.frames = None
+            self.results = None
+            for shm in (self.frame_shm, self.result_shm):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            self.frame_shm = None
+            self.result_shm = None
+
+    def submit(self, img, flipType=None, timestamp=None):
+        """Copy a frame into a free shared slot and queue it; returns the sequence number or None"""
+        if self.process is None or img.shape != self.shape:
+            self.start(img.shape)
+        if not self.free_slots:
+            return None
+
+        slot = self.free_slots.pop()
+        np.copyto(self.frames[slot], img)
+        self.seq += 1
+        flip = self.flipType if flipType is None else flipType
+        timestamp = math.nan if timestamp is None else timestamp
+        self.request_conn.send_bytes(_MESSAGE.pack(slot, self.seq, flip, timestamp))
+        return self.seq
+
+    def poll(self, timeout=0.0):
+        """Collect finished results; returns (seq, hands) of the newest one or None"""
+        newest = None
+        while self.response_conn is not None and self.response_conn.poll(timeout):
+            slot, seq, _, _ = _MESSAGE.unpack(self.response_conn.recv_bytes())
+            self.free_slots.append(slot)
+            if self.metrics is not None:
+                for stage, ms in zip(WORKER_STAGES, self.results['stage_ms'][slot].tolist()):
+                    self.metrics.record(stage, ms)
+            if seq > self.last_seq:
+                self.last_seq = seq
+                self.last_hands = self._decode(slot)
+                newest = (seq, self.last_hands)
+            timeout = 0.0
+        return newest
+
+    def _decode(self, slot):
+        """Turn shared result records into Hand objects"""
+        count = int(self.results['count'][slot])
+        return [Hand(hand['landmarks'].copy(), HAND_TYPES[hand['handedness']], hand['confidence'],
+                     track_id=None if hand['track_id'] < 0 else int(hand['track_id']),
+                     track_age=int(hand['track_age']))
+                for hand in self.results['hands'][slot][:count]]
+
+    def setBackend(self, backend, modelPath=None, modelComplexity=None):
+        """Switch the worker's landmark model; a running worker is restarted with it"""
+        with self.lock:
+            previous = dict(self.detector_kwargs)
+            self.detector_kwargs.update(backend=backend, modelPath=modelPath)
+            if modelComplexity is not None:
+                self.detector_kwargs["modelComplexity"] = modelComplexity
+            if self.fallback is not None:
+                self.fallback.setBackend(backend, modelPath=modelPath, modelComplexity=modelComplexity)
+            elif self.process is not None:
+                try:
+                    self.start(self.shape)
+                except RuntimeError:
+                    # Keep the previous model, the next frame starts the worker with it again
+                    self.detector_kwargs = previous
+                    raise
+
+    def fallbackDetector(self, reason="Hand inference worker died"):
+        """Switch to an in-process HandDetector for good, e.g. after the worker died"""
+        if self.fallback is None:
+            from utils._Digita import HandDetector
+            self.logger.error(f"{reason}, detecting hands in-process")
+            self.stop()
+            self.fallback = HandDetector(**self.detector_kwargs)
+            self.fallback.metrics = self.metrics
+        return self.fallback
+
+    def findHands(self, img, draw=True, flipType=True, timestamp=None):
+        """Send the frame to the worker and wait for its landmarks"""
+        with self.lock:
+            if self.fallback is not None or (self.process is not None and not self.process.is_alive()):
+                return self.fallbackDetector().findHands(img, draw=draw, flipType=flipType, timestamp=timestamp)
+
+            try:
+                seq = self.submit(img, flipType, timestamp)
+            except RuntimeError as e:
+                return self.fallbackDetector(str(e)).findHands(img, draw=draw, flipType=flipType, timestamp=timestamp)
+            if seq is None:
+                return self.last_hands, img
+
+            deadline = time.perf_counter() + self.timeout
+            while self.last_seq < seq:
+                if not self.process.is_alive():
+                    return self.fallbackDetector().findHands(img, draw=draw, flipType=flipType, timestamp=timestamp)
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    # Its slots would never come back, start over with a fresh worker
+                    if self.restarts >= self.max_restarts:
+                        return self.fallbackDetector("Hand inference worker keeps timing out").findHands(
+                            img, draw=draw, flipType=flipType, timestamp=timestamp)
+                    self.restarts += 1
+                    self.logger.error(f"Hand inference worker did not respond, restarting it "
+                                      f"({self.restarts}/{self.max_restarts})")
+                    try:
+                        self.start(self.shape)
+                    except RuntimeError as e:
+                        return self.fallbackDetector(str(e)).findHands(img, draw=draw, flipType=flipType, timestamp=timestamp)
+                    self.last_hands = []
+                    return [], img
+                self.poll(remaining)
+
+            hands = self.last_hands
+            if draw:
+                for hand in hands:
+                    draw_hand(img, hand)
+            return hands, img
+
+    def fingersUp(self, myHand):
+        """Finger states are computed locally, they only need the landmarks"""
+        return finger_states(myHand.pixels).tolist()
@@ -0,0 +1,264 @@
+import math
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from utils.frame_metrics import LatencyHistogram
+
+
+class LandmarkBackend:
+    """
+    Hand landmark model behind HandDetector.findHands.
+
+    process() takes an RGB image and returns one (landmarks, label, score)
+    tuple per hand, landmarks as a normalized (21, 3) float32 array in the
+    MediaPipe convention (x, y relative to the image, z relative to the width).
+    Every call is timed, so backends can be compared on the machine at hand.
+    Backends with own_tracking follow the hand between frames themselves and
+    must always see full frames, HandDetector does no ROI cropping for them.
+    """
+    name = "base"
+    own_tracking = False
+
+    def __init__(self):
+        self.logger = logging.getLogger('gesture_app')
+        self.latency = LatencyHistogram()
+
+    def process(self, imgRGB):
+        start = time.perf_counter()
+        detections = self._process(imgRGB)
+        self.latency.observe((time.perf_counter() - start) * 1000)
+        return detections
+
+    def _process(self, imgRGB):
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget state carried over from previous frames, e.g. before the next video"""
+        pass
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        """Measured latency of this backend"""
+        summary = self.latency.summary()
+        return {
+            "backend": self.name,
+            "calls": summary["count"],
+            "mean_ms": summary["mean_ms"],
+            "p50_ms": summary["p50_ms"],
+            "p95_ms": summary["p95_ms"],
+        }
+
+
+class MediaPipeBackend(LandmarkBackend):
+    """MediaPipe Hands (palm detection + landmarks), model_complexity 0 (lite) or 1 (full)"""
+    name = "mediapipe"
+
+    def __init__(self, max_hands=2, model_complexity=1, detection_con=0.8, min_track_con=0.8,
+                 static_mode=False):
+        super().__init__()
+        self.model_complexity = model_complexity
+        # In video mode MediaPipe keeps its own ROI from the previous frame's landmarks,
+        # feeding it crops and full frames in turn would corrupt that
+        self.own_tracking = not static_mode
+        self.options = dict(static_image_mode=static_mode, max_num_hands=max_hands,
+                            model_complexity=model_complexity, min_detection_confidence=detection_con,
+                            min_tracking_confidence=min_track_con)
+        self.hands = self.create_hands()
+
+    def create_hands(self):
+        import mediapipe as mp
+        return mp.solutions.hands.Hands(**self.options)  # type: ignore
+
+    def reset(self):
+        """MediaPipe has no reset, start a fresh graph without tracking state"""
+        self.hands.close()
+        self.hands = self.create_hands()
+
+    def _process(self, imgRGB):
+        results = self.hands.process(imgRGB)
+        if not results.multi_hand_landmarks:
+            return []
+        return [
+            (np.array([(lm.x, lm.y, lm.z) for lm in handLms.landmark], dtype=np.float32),
+             handType.classification[0].label,
+             handType.classification[0].score)
+            for handType, handLms in zip(results.multi_handedness, results.multi_hand_landmarks)
+        ]
+
+    def close(self):
+        self.hands.close()
+
+
+class QuantizedLandmarkBackend(LandmarkBackend):
+    """
+    Single-hand int8-quantized landmark model run with ONNX Runtime or TFLite.
+
+    The model sees the whole input image, so it should be paired with
+    HandDetector(trackROI=True), which feeds it a crop around the last hand.
+    Expected outputs, in the layout of MediaPipe's hand_landmark model: 63
+    landmark values in input pixels, then a hand presence score, then a
+    handedness score (> 0.5 means "Right").
+    """
+    name = "quantized"
+
+    def __init__(self, model_path=None, runtime=None, detection_con=0.5, num_threads=2):
+        super().__init__()
+        if not model_path:
+            raise ValueError("The quantized backend needs a model file")
+        if runtime is None:
+            runtime = "tflite" if model_path.endswith(".tflite") else "onnx"
+        self.runtime = runtime
+        self.detection_con = detection_con
+
+        if runtime == "onnx":
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = num_threads
+            self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            model_input = self.session.get_inputs()[0]
+            self.input_name = model_input.name
+            shape = model_input.shape
+            self.input_dtype = np.float32 if model_input.type == "tensor(float)" else np.uint8
+            self.input_quant = (0.0, 0)
+        elif runtime == "tflite":
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                from tensorflow.lite import Interpreter
+            self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+            self.interpreter.allocate_tensors()
+            model_input = self.interpreter.get_input_details()[0]
+            self.input_index = model_input["index"]
+            shape = model_input["shape"]
+            self.input_dtype = model_input["dtype"]
+            self.input_quant = model_input["quantization"]
+            self.outputs = self.interpreter.get_output_details()
+        else:
+            raise ValueError(f"Unknown runtime: {runtime}")
+
+        # NCHW if the channel axis comes first, NHWC otherwise
+        self.channels_first = shape[1] == 3
+        self.input_h, self.input_w = (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        self.logger.info(f"Loaded {runtime} landmark model {model_path} ({self.input_w}x{self.input_h})")
+
+    def prepare(self, imgRGB):
+        """Resize to the model input and convert to its dtype"""
+        x = cv2.resize(imgRGB, (self.input_w, self.input_h), interpolation=cv2.INTER_AREA)
+        if np.issubdtype(self.input_dtype, np.floating):
+            x = x.astype(np.float32) / 255.0
+        elif self.input_quant[0]:
+            # Quantize [0, 1] pixels with the input tensor's scale and zero point
+            scale, zero_point = self.input_quant
+            info = np.iinfo(self.input_dtype)
+            x = np.clip(np.round(x / 255.0 / scale + zero_point), info.min, info.max)
+        x = x.astype(self.input_dtype)
+        if self.channels_first:
+            x = x.transpose(2, 0, 1)
+        return x[np.newaxis]
+
+    def run(self, x):
+        """Raw model outputs as float arrays"""
+        if self.runtime == "onnx":
+            return [np.asarray(out, dtype=np.float32) for out in self.session.run(None, {self.input_name: x})]
+
+        self.interpreter.set_tensor(self.input_index, x)
+        self.interpreter.invoke()
+        outputs = []
+        for detail in self.outputs:
+            out = self.interpreter.get_tensor(detail["index"]).astype(np.float32)
+            scale, zero_point = detail["quantization"]
+            if scale:
+                out = (out - zero_point) * scale
+            outputs.append(out)
+        return outputs
+
+    @staticmethod
+    def _probability(value):
+        # Some exports emit logits instead of probabilities
+        return value if 0.0 <= value <= 1.0 else 1.0 / (1.0 + math.exp(-value))
+
+    def _process(self, imgRGB):
+        outputs = self.run(self.prepare(imgRGB))
+        landmarks = next(out for out in outputs if out.size == 63)
+        scores = [float(out.ravel()[0]) for out in outputs if out.size == 1]
+        presence = self._probability(scores[0]) if scores else 1.0
+        if presence < self.detection_con:
+            return []
+
+        lm = landmarks.reshape(21, 3) / np.array((self.input_w, self.input_h, self.input_w), dtype=np.float32)
+        label = "Right" if len(scores) > 1 and self._probability(scores[1]) > 0.5 else "Left"
+        return [(lm.astype(np.float32), label, presence)]
+
+
+class SyntheticBackend(LandmarkBackend):
+    """
+    Deterministic fake hands for tests and benchmarks, no model or camera needed.
+
+    An open hand circles slowly around the image; the same seed always gives
+    the same landmark sequence. latency_ms simulates a slower model.
+    """
+    name = "synthetic"
+
+    # Open right hand, normalized, wrist at the origin
+    BASES = ((-0.08, -0.05), (-0.04, -0.15), (0.0, -0.16), (0.04, -0.15), (0.08, -0.13))
+
+    def __init__(self, max_hands=1, seed=0, jitter=0.002, latency_ms=0.0, score=0.95):
+        super().__init__()
+        self.max_hands = max_hands
+        self.jitter = jitter
+        self.latency_ms = latency_ms
+        self.score = score
+        self.seed = seed
+        self.reset()
+        self.template = self.open_hand()
+
+    @classmethod
+    def open_hand(cls):
+        """(21, 3) float32 normalized landmarks of the open right hand, wrist at the origin"""
+        template = np.zeros((21, 3), dtype=np.float32)
+        for finger, (bx, by) in enumerate(cls.BASES):
+            for joint in range(4):
+                template[1 + finger * 4 + joint] = (bx * (1 + 0.3 * joint), by - 0.05 * joint, -0.01 * joint)
+        return template
+
+    def reset(self):
+        """Start the landmark sequence over"""
+        self.rng = np.random.default_rng(self.seed)
+        self.frame = 0
+
+    def _process(self, imgRGB):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        phase = self.frame * 0.05
+        self.frame += 1
+        detections = []
+        for i in range(self.max_hands):
+            # Hands on both halves of the image, the second one mirrored
+            side = -1 if i % 2 else 1
+            wrist = np.array((0.5 + side * (0.15 + 0.05 * math.cos(phase)), 0.75 + 0.05 * math.sin(phase), 0.0))
+            lm = self.template * (side, 1, 1) + wrist
+            lm = lm + self.rng.normal(0, self.jitter, lm.shape)
+            detections.append((lm.astype(np.float32), "Left" if side > 0 else "Right", self.score))
+        return detections
+
+
+BACKENDS = {
+    "mediapipe": MediaPipeBackend,
+    "quantized": QuantizedLandmarkBackend,
+    "synthetic": SyntheticBackend,
+}
+
+
+def create_backend(name, **kwargs):
+    """Instantiate a backend by name, ignoring options it does not take"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown landmark backend: {name}")
+    cls = BACKENDS[name]
+    accepted = cls.__init__.__code__.co_varnames[1:cls.__init__.__code__.co_argcount]
+    return cls(**{key: value for key, value in kwargs.items() if key in accepted and value is not None})
@@ -0,0 +1,174 @@
+import math
+import threading
+
+import numpy as np
+
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+
+class OneEuroFilter:
+    """
+    One Euro filter applied to a whole landmark array at once.
+
+    The cutoff frequency rises with the speed of each coordinate, so still
+    hands are smoothed heavily while fast swipes pass with little lag.
+    """
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Hz, smoothing when still
+        self.beta = beta              # How fast the cutoff rises with speed
+        self.d_cutoff = d_cutoff      # Hz, smoothing of the speed estimate
+        self.x_prev = None
+        self.dx_prev = None
+        self.t_prev = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t):
+        if self.x_prev is None:
+            self.x_prev = x.copy()
+            self.dx_prev = np.zeros_like(x)
+            self.t_prev = t
+            return x
+
+        dt = t - self.t_prev
+        if dt <= 0:
+            dt = 1.0 / 30
+        self.t_prev = t
+
+        dx = (x - self.x_prev) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        dx_hat = a_d * dx + (1 - a_d) * self.dx_prev
+
+        cutoff = self.min_cutoff + self.beta * np.abs(dx_hat)
+        a = self._alpha(cutoff, dt)
+        x_hat = a * x + (1 - a) * self.x_prev
+
+        self.x_prev = x_hat
+        self.dx_prev = dx_hat
+        return x_hat
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter, one independent filter per coordinate,
+    all updated with elementwise array ops.
+    """
+    def __init__(self, process_noise=50.0, measurement_noise=1e-4):
+        self.process_noise = process_noise          # Acceleration noise, higher follows fast motion better
+        self.measurement_noise = measurement_noise  # Measurement noise, higher smooths more
+        self.x = None   # Positions
+        self.v = None   # Velocities
+        self.P = None   # Covariances stacked as P00, P01, P10, P11
+        self.t_prev = None
+
+    def __call__(self, z, t):
+        if self.x is None:
+            self.x = z.copy()
+            self.v = np.zeros_like(z)
+            self.P = np.stack([np.full_like(z, self.measurement_noise), np.zeros_like(z), np.zeros_like(z), np.ones_like(z)])
+            self.t_prev = t
+            return z
+
+        dt = t - self.t_prev
+        if dt <= 0:
+            dt = 1.0 / 30
+        self.t_prev = t
+
+        q, r = self.process_noise, self.measurement_noise
+
+        # Predict
+        P00, P01, P10, P11 = self.P
+        x = self.x + self.v * dt
+        P00 = P00 + dt * (P10 + P01) + dt * dt * P11 + q * dt ** 4 / 4
+        P01 = P01 + dt * P11 + q * dt ** 3 / 2
+        P10 = P10 + dt * P11 + q * dt ** 3 / 2
+        P11 = P11 + q * dt ** 2
+
+        # Update with the measured position
+        S = P00 + r
+        K0 = P00 / S
+        K1 = P10 / S
+        y = z - x
+        self.x = x + K0 * y
+        self.v = self.v + K1 * y
+        self.P = np.stack([(1 - K0) * P00, (1 - K0) * P01, P10 - K1 * P00, P11 - K1 * P01])
+        return self.x
+
+
+def filter_params(kind, smoothing):
+    """
+    Map the lag-vs-jitter setting (0 = most responsive, 1 = smoothest) onto filter parameters
+    """
+    smoothing = min(max(smoothing, 0.0), 1.0)
+    if kind == "kalman":
+        return {"process_noise": 10 ** _lerp(3.0, 0.0, smoothing), "measurement_noise": 1e-4}
+    return {"min_cutoff": _lerp(4.0, 0.3, smoothing), "beta": _lerp(20.0, 4.0, smoothing)}
+
+
+FILTER_TYPES = {
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+class LandmarkFilterBank:
+    """
+    Per-track landmark filters.
+
+    Filter state is keyed by a stable hand track ID, so two hands never blend
+    into each other. Tracks that have not been seen for max_idle seconds are
+    forgotten. The inference thread filters while the GUI changes settings,
+    so the filter dict is only touched under a lock.
+    """
+    def __init__(self, kind="one_euro", smoothing=0.5, max_idle=0.5):
+        if kind not in FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {kind}")
+        self.kind = kind
+        self.smoothing = smoothing
+        self.max_idle = max_idle
+        self.filters = {}    # track id -> filter
+        self.last_seen = {}  # track id -> timestamp
+        self.lock = threading.Lock()
+
+    def filter(self, track_id, landmarks, t):
+        """Filter a (21, 3) landmark array of one track"""
+        with self.lock:
+            flt = self.filters.get(track_id)
+            if flt is None:
+                flt = self.filters[track_id] = FILTER_TYPES[self.kind](**filter_params(self.kind, self.smoothing))
+            self.last_seen[track_id] = t
+            return flt(landmarks, t)
+
+    def prune(self, t):
+        """Drop filters of tracks that disappeared"""
+        with self.lock:
+            for track_id in [tid for tid, seen in self.last_seen.items() if t - seen > self.max_idle]:
+                del self.filters[track_id]
+                del self.last_seen[track_id]
+
+    def set_smoothing(self, smoothing):
+        """Change the lag-vs-jitter setting of all running filters"""
+        with self.lock:
+            self.smoothing = smoothing
+            params = filter_params(self.kind, smoothing)
+            for flt in self.filters.values():
+                for name, value in params.items():
+                    setattr(flt, name, value)
+
+    def set_kind(self, kind):
+        """Switch between One Euro and Kalman filtering"""
+        if kind not in FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {kind}")
+        with self.lock:
+            self.kind = kind
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.filters = {}
+            self.last_seen = {}
@@ -1,18 +1,75 @@
 import numpy as np
-import cv2
-import tensorflow as tf
 import os
 import logging
-import pickle
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+import time
+import hashlib
+from importlib.metadata import version, PackageNotFoundError
+
+from utils.model_store import ModelStore, config_hash
+from utils.compiled_forest import CompiledForest, export_forest
+from utils.distilled_model import DistilledMLP, distill, compare_models, format_report
+from utils.temporal_gestures import LandmarkWindow, SwipeDetector
+from utils.hand_features import extract, extract_batch
+from utils.online_training import CalibrationDataset, BackgroundTrainer
+from utils.synthetic_hands import generate
+
+# Bump when the features or the training data change, cached models are retrained then
+FEATURE_VERSION = 3
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "models", "gesture_model.pkl")
+
+
+def forest_dir(model_path):
+    """Directory of the compiled forest that belongs to a pickled model"""
+    return os.path.splitext(model_path)[0] + ".forest"
+
+
+CLASSIFIERS = ("forest", "distilled")
+
+# Extended fingers (Thumb..Pinky) of each trained gesture, in gesture_names order
+GESTURE_PATTERNS = {
+    "previous_slide": [1, 0, 0, 0, 0],  # Thumb up
+    "next_slide": [0, 0, 0, 0, 1],      # Pinky up
+    "pointer": [0, 1, 1, 0, 0],         # Index + Middle up
+    "draw": [0, 1, 0, 0, 0],            # Index up
+    "erase": [0, 1, 1, 1, 0],           # Index + Middle + Ring up
+}
+
+
+class GestureSmoother:
+    """
+    Stateful temporal smoothing of per-frame predictions: a frame with low
+    confidence keeps the previous gesture instead of flickering to another one.
+    """
+    def __init__(self, hold_confidence=0.4):
+        self.hold_confidence = hold_confidence
+        self.reset()
+
+    def reset(self):
+        self.prev_gesture = "none"
+
+    def update(self, label, confidence):
+        """Smoothed label of the next frame"""
+        if confidence < self.hold_confidence and self.prev_gesture != "none":
+            label = self.prev_gesture
+        self.prev_gesture = label
+        return label
+
+    def smooth(self, labels, confidences):
+        """Smoothed labels of a whole sequence, e.g. the output of predict_batch"""
+        return [self.update(str(label), confidence) for label, confidence in zip(labels, confidences)]
+
 
 class MLGestureRecognizer:
     def __init__(self, model_path=None):
         self.logger = logging.getLogger('gesture_app')
+        start = time.perf_counter()
         
         self.model = None
+        self.compiled = None  # CompiledForest used for prediction, no scikit-learn needed
+        self.distilled = None  # Small numpy MLP trained on the forest's outputs
+        self.classifier = "forest"
         self.gesture_names = [
             "previous_slide",  # Thumb up
             "next_slide",      # Pinky up
@@ -21,189 +78,465 @@ class MLGestureRecognizer:
             "erase",           # Index, middle, and ring up
             "none"             # No gesture
         ]
-   
-        
-        # Fixed number of samples
-        n_landmarks = 21
-        n_features = n_landmarks * 3
-        samples_per_gesture = 10
-        n_gestures = len(self.gesture_names) - 1  # Excluding 'none'
-        total_samples = samples_per_gesture * n_gestures
-        
-        # Initialize training data arrays with correct sizes
-        self.training_data = np.zeros((total_samples, n_features))
-        self.training_labels = np.zeros(total_samples, dtype=int)
-        
-        # Generate base gestures
-        base_gestures = {
-            "previous_slide": [1] + [0]*19,  # Thumb up
-            "next_slide": [0]*19 + [1],      # Pinky up
-            "pointer": [0,0,1,1] + [0]*16,   # Index + Middle up
-            "draw": [0,1] + [0]*18,          # Index up
-            "erase": [0,1,1,1] + [0]*16,     # Index + Middle + Ring up
+        self.samples_per_gesture = 200
+        self.training_seed = 0
+        self.forest_params = {
+            "n_estimators": 100,
+            "max_depth": 10,
+            "min_samples_split": 4,
+            "min_samples_leaf": 2,
+            "random_state": 42,
         }
         
-        # Create training samples with consistent indexing
-        for i, gesture_name in enumerate(self.gesture_names[:-1]):  # Exclude 'none'
-            base = base_gestures.get(gesture_name, [0]*20)
-            for j in range(samples_per_gesture):
-                idx = i * samples_per_gesture + j
-                sample = np.zeros(n_features)
-                
-                # Set coordinates for active fingers
-                for k, val in enumerate(base):
-                    if val:
-                        # Add slight variations for robustness
-                        sample[k*3:(k+1)*3] = [
-                            0.5 + np.random.normal(0, 0.1),
-                            0.8 + np.random.normal(0, 0.1),
-                            0.0 + np.random.normal(0, 0.1)
-                        ]
-                
-                self.training_data[idx] = sample
-                self.training_labels[idx] = i
+        # Everything that affects the trained model, a cached model is only reused if this matches
+        self.config_hash = config_hash({
+            "feature_version": FEATURE_VERSION,
+            "gesture_names": self.gesture_names,
+            "samples_per_gesture": self.samples_per_gesture,
+            "training_seed": self.training_seed,
+            "forest_params": self.forest_params,
+            "sklearn": self.sklearn_version(model_path),
+        })
+        # Identifies the live forest: the configuration plus any extra training data, e.g. calibration
+        self.model_hash = self.config_hash
         
-        # Ensure model is always initialized
-        if not self.model or not hasattr(self.model, 'estimators_'):
-            # Train model with the generated data
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=4,
-                min_samples_leaf=2,
-                random_state=42,
-                n_jobs=-1
-            )
-            self.model.fit(self.training_data, self.training_labels)
+        # Fastest start: the memory-mapped compiled forest, without importing scikit-learn
+        self.model_path = model_path
+        self.forest_path = forest_dir(model_path) if model_path else None
+        self.distilled_path = os.path.splitext(model_path)[0] + ".distilled.npz" if model_path else None
+        source = "loaded compiled forest"
+        if self.forest_path:
+            self.compiled = self.load_compiled(self.forest_path)
+        
+        if self.compiled is None:
+            self.model, source = self.load_or_train()
+            self.compile_model()
         
         # Set parameters for prediction
         self.confidence_threshold = 0.3  # Lower threshold for better detection
-        self.gesture_history = []
-        self.history_size = 5  # Increase history size
-        self.prev_gesture = "none"
+        self.smoother = GestureSmoother()
+        
+        # Dynamic gestures (swipes, flicks) over a sliding window of recent landmarks
+        self.history_size = 12  # Frames in the window, about 0.4 s at 30 fps
+        self.gesture_history = LandmarkWindow(self.history_size)
+        self.swipe_detector = SwipeDetector()
+        self.history_track = None
+        
+        # Presenter calibration: labelled samples, retrained in the background and hot-swapped
+        self.calibration = CalibrationDataset()
+        self.trainer = None
+        self.distiller = None  # BackgroundTrainer of set_classifier(..., wait=False)
+        self.requested_classifier = self.classifier
+        self.model_version = 0  # Incremented whenever a retrained model is swapped in
+        
+        # Optional FrameMetrics recorder for per-stage latency
+        self.metrics = None
+        
+        self.startup_time = time.perf_counter() - start
+        self.logger.info(f"Gesture model {source} in {self.startup_time * 1000:.0f} ms")
+    
+    def sklearn_version(self, model_path):
+        """Installed scikit-learn version, or the one the compiled forest was built with if it is missing"""
+        try:
+            return version("scikit-learn")
+        except PackageNotFoundError:
+            pass
+        try:
+            return CompiledForest.read_meta(forest_dir(model_path)).get("sklearn") if model_path else None
+        except (OSError, ValueError):
+            return None
+    
+    def load_or_train(self):
+        """
+        The cached scikit-learn forest of this configuration, trained with forest_params
+        and cached if there is none. Returns the model and where it came from.
+        """
+        store = ModelStore(self.model_path) if self.model_path else None
+        model = store.load(self.config_hash) if store is not None else None
+        if model is not None:
+            return model, "loaded from cache"
+        
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(n_jobs=-1, **self.forest_params)
+        model.fit(*self.generate_training_data())
+        if store is not None:
+            store.save(model, self.config_hash)
+        return model, "trained"
+    
+    def sklearn_model(self):
+        """The scikit-learn forest; after starting from the compiled forest it is loaded on first use"""
+        if self.model is None:
+            self.model, source = self.load_or_train()
+            self.logger.info(f"Gesture model {source} for scikit-learn use")
+        return self.model
+    
+    def parity_rows(self):
+        """Training-like rows plus random ones that reach the other branches of the forest"""
+        X = self.generate_training_data()[0]
+        return np.vstack([X, np.random.default_rng(0).normal(0, 0.3, (500, X.shape[1]))])
+    
+    def check_compiled(self, X=None):
+        """Max difference between the compiled and the scikit-learn forest; raises ValueError if they differ"""
+        if self.compiled is None:
+            raise ValueError("No compiled forest in use")
+        return self.compiled.check_parity(self.sklearn_model(), self.parity_rows() if X is None else X)
     
-        # Save newly trained model
-        if model_path:
-            self.save_model(model_path)
+    def load_compiled(self, path):
+        """Open the compiled forest at path if it was built from the current configuration"""
+        try:
+            forest = CompiledForest.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Error loading compiled forest: {str(e)}")
+            return None
+        return forest if forest.meta.get("config_hash") == self.config_hash else None
     
+    def compile_model(self, X_check=None, save=True):
+        """
+        Flatten the scikit-learn forest for prediction; it must match predict_proba first.
+        With save the compiled forest is also written next to the model file.
+        """
+        if X_check is None:
+            X_check = self.parity_rows()
+        try:
+            if save and self.forest_path:
+                self.compiled = export_forest(self.model, self.forest_path, X_check, self.config_hash)
+            else:
+                self.compiled = CompiledForest.from_sklearn(self.model, self.config_hash)
+                self.compiled.check_parity(self.model, X_check)
+        except Exception as e:
+            self.logger.error(f"Could not compile gesture forest, using scikit-learn: {str(e)}")
+            self.compiled = None
+    
+    def set_classifier(self, name, wait=True):
+        """
+        Switch between the random forest and the distilled MLP, distilling it first if needed.
+        Without wait a missing student is distilled in the background and switched to once it
+        is ready; returns whether the switch already happened.
+        """
+        if name not in CLASSIFIERS:
+            raise ValueError(f"Unknown classifier: {name}")
+        self.requested_classifier = name
+        if name == "distilled" and self.distilled is None:
+            self.distilled = self.load_distilled()
+            if self.distilled is None:
+                if not wait:
+                    self.distill_async()
+                    return False
+                self.distill_model()
+        self.classifier = name
+        self.logger.info(f"Gesture classifier: {name}")
+        return True
+    
+    def distill_async(self):
+        """Distill the student on a background thread, see install_distilled()"""
+        if self.distiller is None:
+            self.distiller = BackgroundTrainer(lambda: self.fit_distilled()[0], self.install_distilled)
+        return self.distiller.request()
+    
+    def install_distilled(self, student):
+        """Use a student distilled in the background, unless the forest was retrained meanwhile"""
+        if student.config_hash != self.model_hash:
+            self.logger.info("Distilled gesture model is stale, the forest was retrained meanwhile")
+            return
+        self.distilled = student
+        if self.requested_classifier == "distilled":
+            self.classifier = "distilled"
+            self.logger.info("Gesture classifier: distilled")
+    
+    def load_distilled(self):
+        """The saved distilled model, if it was trained from the current configuration"""
+        if not self.distilled_path or not os.path.exists(self.distilled_path):
+            return None
+        try:
+            model = DistilledMLP.load(self.distilled_path)
+        except Exception as e:
+            self.logger.error(f"Error loading distilled model: {str(e)}")
+            return None
+        # A student of a forest that was retrained since is stale
+        return model if model.config_hash == self.model_hash else None
+    
+    def forest_proba(self, X):
+        """Forest probabilities for a batch, the teacher of the distilled model"""
+        if self.compiled is not None:
+            return self.compiled.predict_proba(X)
+        return self.model.predict_proba(X) # type: ignore
+    
+    def distillation_data(self, n=10000, seed=0):
+        """
+        Training-like hands with jittered joints ("near") and random point clouds ("random"),
+        so the student also learns how the forest behaves away from the training samples
+        """
+        rng = np.random.default_rng(seed)
+        landmarks, _ = self.training_landmarks()
+        base = landmarks[rng.integers(0, len(landmarks), n // 2)]
+        palm = np.linalg.norm(base[:, 9, :2] - base[:, 0, :2], axis=1)
+        near = base + rng.normal(0, 0.05, base.shape) * palm[:, None, None]
+        wide = rng.normal(0, 100, (n - n // 2, 21, 3))
+        return np.vstack([extract_batch(landmarks), extract_batch(near)]), extract_batch(wide)
+    
+    def distill_model(self, save=True):
+        """Train the distilled MLP on the forest's outputs and log an accuracy/latency comparison"""
+        self.distilled, report = self.fit_distilled(save)
+        return report
+    
+    def fit_distilled(self, save=True):
+        """The student of the live forest and its comparison report; safe to run on a background thread"""
+        model_hash = self.model_hash
+        near, wide = self.distillation_data()
+        rng = np.random.default_rng(1)
+        near, wide = near[rng.permutation(len(near))], wide[rng.permutation(len(wide))]
+        near_holdout, wide_holdout = len(near) // 5, len(wide) // 5
+        X = np.vstack([near[near_holdout:], wide[wide_holdout:]])
+        
+        start = time.perf_counter()
+        student = distill(X, self.forest_proba(X), config_hash=model_hash)
+        self.logger.info(f"Distilled gesture model trained in {(time.perf_counter() - start) * 1000:.0f} ms")
+        
+        # Agreement with the forest on held-out rows, separately for both kinds of input
+        models = {"forest": self.forest_proba, "distilled": student.predict_proba}
+        report = {
+            "near": compare_models(models, near[:near_holdout]),
+            "random": compare_models(models, wide[:wide_holdout]),
+        }
+        for name, part in report.items():
+            self.logger.info(f"Gesture classifier comparison, held-out {name} rows:\n" + format_report(part))
+        if save and self.distilled_path:
+            student.save(self.distilled_path)
+        return student, report
+    
+    def predict_proba(self, features):
+        """Class probabilities of one feature row or a batch of rows"""
+        # Read each model once, a background retrain may swap them at any time
+        distilled, compiled = self.distilled, self.compiled
+        if self.classifier == "distilled" and distilled is not None:
+            return distilled.predict_proba(features)
+        if compiled is not None:
+            return compiled.predict_proba(features)
+        features = np.asarray(features)
+        proba = self.model.predict_proba(np.atleast_2d(features)) # type: ignore
+        return proba[0] if features.ndim == 1 else proba
+    
+    def training_landmarks(self):
+        """
+        Synthetic hands, about samples_per_gesture per gesture (excluding 'none'),
+        as (N, 21, 3) pixel landmarks and labels; see utils.synthetic_hands
+        """
+        patterns = [GESTURE_PATTERNS[name] for name in self.gesture_names[:-1]]
+        return generate(patterns, self.samples_per_gesture * len(patterns), seed=self.training_seed)
+    
+    def generate_training_data(self):
+        """Features and labels of the synthetic training hands"""
+        landmarks, labels = self.training_landmarks()
+        return extract_batch(landmarks), labels
+
+    def evaluate(self, landmarks, labels):
+        """Accuracy on recorded (N, 21, 3) landmarks, through the same features as live prediction"""
+        _, probas = self.predict_batch(landmarks)
+        return float((np.argmax(probas, axis=1) == np.asarray(labels)).mean())
+
     def update_gestures(self, new_gestures):
         """Update the gesture mappings used by the recognizer"""
         self.gestures = new_gestures
     
     def preprocess_landmarks(self, landmarks):
-        """Improved landmark processing"""
-        if not landmarks or len(landmarks) < 21:
+        """Scale- and rotation-invariant features of one hand, see utils.hand_features"""
+        if landmarks is None or len(landmarks) < 21:
             return None
             
         try:
-            # Extract coordinates and normalize
-            coords = []
-            base_x, base_y = landmarks[0][0], landmarks[0][1]  # Use wrist as reference
-            
-            for lm in landmarks:
-                # Normalize coordinates relative to wrist
-                x = (lm[0] - base_x) / 640  # Normalize by image width
-                y = (lm[1] - base_y) / 480  # Normalize by image height
-                z = lm[2] if len(lm) > 2 else 0.0
-                coords.extend([x, y, z])
-            
-            # Ensure consistent feature length
-            if len(coords) > 63:  # 21 landmarks * 3 coordinates
-                coords = coords[:63]
-            elif len(coords) < 63:
-                coords.extend([0.0] * (63 - len(coords)))
-            
-            return coords
-            
+            return extract(landmarks)
         except Exception as e:
             self.logger.error(f"Landmark preprocessing error: {str(e)}")
             return None
 
-    def predict_gesture(self, landmarks):
-        """Improved gesture prediction"""
+    def classify(self, features):
+        """Labels, confidences and probabilities of a (N, n_features) batch, without smoothing"""
+        probas = np.atleast_2d(self.predict_proba(features))
+        indices = np.argmax(probas, axis=1)
+        confidences = probas[np.arange(len(probas)), indices]
+        labels = np.array(self.gesture_names)[indices]
+        labels[confidences < self.confidence_threshold] = "none"
+        return labels, confidences, probas
+
+    def predict_batch(self, landmarks, chunk_size=10000):
+        """
+        Stateless prediction for many hands at once, e.g. a whole recorded session.
+        landmarks: (N, 63) or (N, 21, 3); returns (N,) labels and (N, n_classes) probabilities.
+        Runs in chunks of chunk_size rows to bound the memory of the forest traversal.
+        """
+        lm = np.asarray(landmarks, dtype=np.float32)
+        if not len(lm):
+            return np.array([], dtype=str), np.zeros((0, len(self.gesture_names) - 1))
+        lm = lm.reshape(len(lm), 21, -1)
+        labels, probas = [], []
+        for start in range(0, len(lm), chunk_size):
+            chunk_labels, _, chunk_probas = self.classify(extract_batch(lm[start:start + chunk_size]))
+            labels.append(chunk_labels)
+            probas.append(chunk_probas)
+        return np.concatenate(labels), np.vstack(probas)
+
+    def predict_raw(self, landmarks):
+        """Gesture and confidence of one hand without smoothing; confidence is None without a prediction"""
         try:
+            start = time.perf_counter()
             features = self.preprocess_landmarks(landmarks)
-            if not features:
-                return "none"
-
-            # Reshape and predict
-            features = np.array(features).reshape(1, -1)
-            probas = self.model.predict_proba(features)[0] # type: ignore
-            prediction_idx = np.argmax(probas)
-            confidence = probas[prediction_idx]
-            
-            # Get current prediction
-            current_pred = self.gesture_names[prediction_idx]
-            
-            # Apply temporal smoothing
-            if confidence < self.confidence_threshold:
-                current_pred = "none"
-            
-            # Use previous gesture if confidence is close
-            if confidence < 0.4 and self.prev_gesture != "none":
-                current_pred = self.prev_gesture
-            
-            # Update previous gesture
-            self.prev_gesture = current_pred
+            if features is None:
+                return "none", None
+            extracted = time.perf_counter()
+
+            labels, confidences, _ = self.classify(features[np.newaxis])
+            if self.metrics is not None:
+                self.metrics.record("feature_extraction", (extracted - start) * 1000)
+                self.metrics.record("classification", (time.perf_counter() - extracted) * 1000)
             
-            return current_pred
+            return str(labels[0]), float(confidences[0])
             
         except Exception as e:
             self.logger.error(f"Prediction error: {str(e)}")
-            return "none"
+            return "none", None
+    
+    def predict_gesture(self, landmarks):
+        """Gesture of one hand, smoothed over the previous frames"""
+        label, confidence = self.predict_raw(landmarks)
+        if confidence is None:
+            return label
+        return self.smoother.update(label, confidence)
             
+    def set_history_size(self, size):
+        """Change the number of frames the dynamic gestures look back"""
+        self.history_size = size
+        self.gesture_history.resize(size)
+    
+    def reset_history(self):
+        """Forget the landmark window and the smoothed gesture, e.g. when the hand leaves the frame"""
+        self.gesture_history.clear()
+        self.history_track = None
+        self.smoother.reset()
+    
+    def predict_dynamic(self, landmarks, timestamp, track_id=None):
+        """
+        Add one frame of pixel landmarks to the window and return "next_slide",
+        "previous_slide" or "none" depending on a swipe or flick. O(1) per frame.
+        """
+        if track_id != self.history_track:
+            # A different hand took over, its movement does not continue the old one
+            self.gesture_history.clear()
+            self.history_track = track_id
+        self.gesture_history.push(landmarks, timestamp)
+        return self.swipe_detector.update(self.gesture_history, timestamp) or "none"
+    
     def train_model(self, training_data, labels):
         """Train the model with labeled data"""
         try:
-            # Ensure model is initialized
-            if self.model is None:
-                self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-                
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.model_selection import train_test_split
+            from sklearn.metrics import accuracy_score
+            
             # Split data into training and testing sets
             X_train, X_test, y_train, y_test = train_test_split(
                 training_data, labels, test_size=0.2, random_state=42
             )
             
-            # Train the model
-            self.model.fit(X_train, y_train)
+            # Train a forest with the configured parameters, also when only the compiled one is loaded
+            model = RandomForestClassifier(n_jobs=-1, **self.forest_params)
+            model.fit(X_train, y_train)
+            self.model = model
+            # The saved and the loaded student mimic the previous forest
+            self.model_hash = self.data_hash(np.asarray(training_data), np.asarray(labels))
+            self.distilled = None
+            self.classifier = self.requested_classifier = "forest"
             
             # Evaluate
             predictions = self.model.predict(X_test)
             accuracy = accuracy_score(y_test, predictions)
             self.logger.info(f"Model trained with accuracy: {accuracy:.4f}")
+            
+            # Keep the fast path in sync with the new forest
+            self.compile_model(np.asarray(training_data), save=False)
             return accuracy
         except Exception as e:
             self.logger.error(f"Training error: {str(e)}")
             return 0.0
     
+    def add_calibration_sample(self, landmarks, gesture_name):
+        """Store one labelled hand of the current presenter for the next retrain"""
+        if gesture_name not in self.gesture_names[:-1]:
+            raise ValueError(f"Cannot calibrate gesture: {gesture_name}")
+        self.calibration.add(landmarks, self.gesture_names.index(gesture_name))
+    
+    def retrain_async(self):
+        """
+        Retrain on the synthetic data plus the calibration samples on a background
+        thread; the new model replaces the live one only once it is compiled and checked
+        """
+        if self.trainer is None:
+            self.trainer = BackgroundTrainer(self.fit_calibrated, self.swap_model)
+        return self.trainer.request()
+    
+    def data_hash(self, *arrays):
+        """Hash of the configuration plus extra training arrays, for a forest not trained on the synthetic data alone"""
+        digest = hashlib.sha256(self.config_hash.encode("utf-8"))
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+    
+    def fit_calibrated(self):
+        """Train and compile a forest on the current data; runs on the training thread"""
+        from sklearn.ensemble import RandomForestClassifier
+        start = time.perf_counter()
+        landmarks, labels = self.training_landmarks()
+        calibration, calibration_labels = self.calibration.snapshot()
+        X = extract_batch(np.vstack([landmarks, calibration]))
+        y = np.concatenate([labels, calibration_labels])
+        
+        model = RandomForestClassifier(n_jobs=1, **self.forest_params)
+        model.fit(X, y)
+        model_hash = self.data_hash(calibration, calibration_labels)
+        compiled = CompiledForest.from_sklearn(model, model_hash)
+        compiled.check_parity(model, X)
+        self.logger.info(f"Gesture model retrained on {len(calibration)} calibration samples "
+                         f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return model, compiled, model_hash
+    
+    def swap_model(self, result):
+        """Make a retrained (model, compiled, model_hash) result the live one"""
+        model, compiled, model_hash = result
+        # The distilled student mimics the old forest, fall back to the new forest;
+        # the new hash keeps load_distilled() from reusing the saved student
+        self.distilled = None
+        self.classifier = self.requested_classifier = "forest"
+        self.model = model
+        self.compiled = compiled
+        self.model_hash = model_hash
+        self.model_version += 1
+    
     def save_model(self, path):
-        """Save the trained model to a file"""
-        if not self.model:
-            return False
-            
+        """Save the trained model to a file, tagged with the current configuration hash"""
         try:
-            with open(path, 'wb') as f:
-                pickle.dump(self.model, f)
-            self.logger.info(f"Model saved to {path}")
-            return True
+            model = self.sklearn_model()
         except Exception as e:
-            self.logger.error(f"Error saving model: {str(e)}")
+            self.logger.error(f"Error preparing model for saving: {str(e)}")
             return False
+        return ModelStore(path).save(model, self.config_hash)
     
     def load_model(self, path):
-        """Load a trained model from a file"""
-        try:
-            with open(path, 'rb') as f:
-                self.model = pickle.load(f)
-            self.logger.info(f"Model loaded from {path}")
-            return True
-        except Exception as e:
-            self.logger.error(f"Error loading model: {str(e)}")
+        """Load a trained model from a file if it matches the current configuration"""
+        model = ModelStore(path).load(self.config_hash)
+        if model is None:
             return False
+        self.model = model
+        self.model_hash = self.config_hash
+        self.distilled = None
+        self.classifier = self.requested_classifier = "forest"
+        self.compile_model(save=False)
+        self.logger.info(f"Model loaded from {path}")
+        return True
             
     def collect_training_example(self, landmarks, gesture_index):
         """Collect a training example for a specific gesture"""
         features = self.preprocess_landmarks(landmarks)
-        if features:
+        if features is not None:
             return features, gesture_index
         return None, None
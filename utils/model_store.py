@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+import tempfile
+
+
+def config_hash(config):
+    """Stable hash of a JSON-serializable training configuration"""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ModelStore:
+    """
+    Pickled model file tagged with the hash of the configuration it was trained with.
+
+    load() only returns a model whose hash matches, so changing the features,
+    the gesture list or the training parameters forces a retrain, while an
+    unchanged setup starts from the cached file. save() writes to a temporary
+    file and renames it, so a crash never leaves a half-written model behind.
+    """
+    def __init__(self, path):
+        self.logger = logging.getLogger('gesture_app')
+        self.path = path
+
+    def load(self, expected_hash):
+        """Return the stored model if its config hash matches, otherwise None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            self.logger.error(f"Error loading model from {self.path}: {str(e)}")
+            return None
+
+        if not isinstance(entry, dict) or entry.get("config_hash") != expected_hash:
+            self.logger.info(f"Model in {self.path} was trained with a different configuration")
+            return None
+        return entry["model"]
+
+    def save(self, model, model_hash):
+        """Atomically replace the stored model"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".model-", dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({"config_hash": model_hash, "created": time.time(), "model": model}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            self.logger.error(f"Error saving model to {self.path}: {str(e)}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        self.logger.info(f"Model saved to {self.path}")
+        return True
@@ -0,0 +1,101 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class CalibrationDataset:
+    """
+    Bounded ring buffer of labelled landmark samples for the current presenter.
+
+    Once capacity samples are stored the oldest ones are overwritten, so a long
+    calibration never grows memory. add() is called from the frame loop and
+    snapshot() from the training thread, both under one short lock.
+    """
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self.landmarks = np.zeros((capacity, 21, 3), dtype=np.float32)
+        self.labels = np.zeros(capacity, dtype=np.int64)
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.count = 0
+            self.next = 0  # Slot the next sample is written to
+
+    def __len__(self):
+        return self.count
+
+    def add(self, landmarks, label):
+        """Store one (21, 2+) landmark array with its class index"""
+        lm = np.asarray(landmarks, dtype=np.float32)
+        with self.lock:
+            self.landmarks[self.next, :, :min(3, lm.shape[1])] = lm[:21, :3]
+            self.labels[self.next] = label
+            self.next = (self.next + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def snapshot(self):
+        """Copies of the stored (N, 21, 3) landmarks and (N,) labels"""
+        with self.lock:
+            return self.landmarks[:self.count].copy(), self.labels[:self.count].copy()
+
+    def counts(self):
+        """Number of stored samples per class index"""
+        with self.lock:
+            labels, counts = np.unique(self.labels[:self.count], return_counts=True)
+        return dict(zip(labels.tolist(), counts.tolist()))
+
+
+class BackgroundTrainer:
+    """
+    Runs a training function on one worker thread, away from the frame loop.
+
+    request() returns immediately. The result of each run is handed to
+    on_done on the worker thread; a request that arrives while training is
+    running is coalesced into a single follow-up run on the newest data.
+    """
+    def __init__(self, train_fn, on_done):
+        self.logger = logging.getLogger('gesture_app')
+        self.train_fn = train_fn
+        self.on_done = on_done
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gesture-train")
+        self.lock = threading.Lock()
+        self.running = False
+        self.pending = False
+        self.runs = 0
+        self.last_error = None
+
+    @property
+    def busy(self):
+        return self.running
+
+    def request(self):
+        """Schedule a training run; returns False if it was merged into a pending one"""
+        with self.lock:
+            if self.running:
+                self.pending = True
+                return False
+            self.running = True
+        self.executor.submit(self._run)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.on_done(self.train_fn())
+                self.runs += 1
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                self.logger.error(f"Background training error: {str(e)}")
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
+                self.pending = False
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,186 @@
+import sys
+import json
+import time
+import logging
+import argparse
+
+import cv2
+
+from utils.hand import Hand
+from utils.gesture_logic import GestureDecider
+
+
+class LandmarkRecorder:
+    """Writes detected hands as a JSON-lines landmark stream"""
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, timestamp, hands):
+        record = {"t": round(timestamp, 4), "hands": [hand.to_dict() for hand in hands]}
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def read_landmark_stream(path):
+    """Yield (timestamp, hands) from a JSON-lines landmark stream"""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            hands = [Hand(hand.get("landmarks", hand.get("lmList")), hand["type"], hand["confidence"],
+                          predicted=hand.get("predicted", False), track_id=hand.get("track_id"),
+                          track_age=hand.get("track_age", 0))
+                     for hand in record["hands"]]
+            yield record["t"], hands
+
+
+class ReplayEngine:
+    """
+    Headless replay of recorded video files or landmark streams.
+
+    Frames go through the same HandDetector / MLGestureRecognizer /
+    GestureDecider path as the GUI, but without a camera or a Qt window.
+    Slide state is simulated so slide events respect the deck bounds
+    (num_slides=None means an unbounded deck).
+    """
+    def __init__(self, decider, detector=None, realtime=False, num_slides=100, flip=True, on_event=None):
+        self.logger = logging.getLogger('gesture_app')
+        self.decider = decider
+        self.detector = detector
+        self.realtime = realtime        # Pace frames by their timestamps instead of running flat out
+        self.num_slides = num_slides
+        self.flip = flip                # Mirror video frames like the live camera path
+        self.on_event = on_event
+
+        self.current_slide_idx = 0
+        self.frames = 0
+        self.events = []
+
+    def reset(self):
+        self.current_slide_idx = 0
+        self.frames = 0
+        self.events = []
+
+    def process(self, timestamp, hands):
+        """Run the decision logic on one frame's hands and collect its events"""
+        self.frames += 1
+        decision = self.decider.decide(
+            hands, timestamp,
+            can_prev=self.num_slides is None or self.current_slide_idx > 0,
+            can_next=self.num_slides is None or self.current_slide_idx < self.num_slides - 1)
+
+        for event in decision["events"]:
+            if event["type"] == "previous_slide":
+                self.current_slide_idx -= 1
+            elif event["type"] == "next_slide":
+                self.current_slide_idx += 1
+
+            event = dict(event, frame=self.frames - 1, t=round(timestamp, 4), slide=self.current_slide_idx)
+            self.events.append(event)
+            if self.on_event:
+                self.on_event(event)
+        return decision
+
+    def _pace(self, start, timestamp):
+        if self.realtime:
+            delay = timestamp - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+    def replay_video(self, path, recorder=None):
+        """Replay a video file through hand detection and the decision logic"""
+        if self.detector is None:
+            raise ValueError("Video replay needs a hand detector")
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video {path}")
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        start = time.perf_counter()
+        index = 0
+        try:
+            while True:
+                success, img = cap.read()
+                if not success:
+                    break
+                timestamp = index / fps
+                index += 1
+                self._pace(start, timestamp)
+
+                if self.flip:
+                    img = cv2.flip(img, 1)
+                # Filters run on the video clock, so paced and full-speed replays give the same landmarks
+                hands, _ = self.detector.findHands(img, draw=False, timestamp=timestamp)
+                if recorder is not None:
+                    recorder.write(timestamp, hands)
+                self.process(timestamp, hands)
+        finally:
+            cap.release()
+        return self.summary(time.perf_counter() - start)
+
+    def replay_landmarks(self, path):
+        """Replay a recorded landmark stream through the decision logic only"""
+        start = time.perf_counter()
+        for timestamp, hands in read_landmark_stream(path):
+            self._pace(start, timestamp)
+            self.process(timestamp, hands)
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, elapsed):
+        counts = {}
+        for event in self.events:
+            counts[event["type"]] = counts.get(event["type"], 0) + 1
+        return {
+            "frames": self.frames,
+            "elapsed": elapsed,
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "final_slide": self.current_slide_idx,
+            "event_counts": counts,
+            "stillness": self.decider.stillness.get_stats(),
+            "cascade": self.decider.cascade.get_stats(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a video or landmark stream through the gesture pipeline")
+    parser.add_argument("source", help="Video file, or a .jsonl landmark stream")
+    parser.add_argument("--realtime", action="store_true", help="Replay at recorded speed instead of as fast as possible")
+    parser.add_argument("--slides", type=int, default=100, help="Number of slides in the simulated deck")
+    parser.add_argument("--threshold", type=int, default=600, help="Gesture threshold line in pixels")
+    parser.add_argument("--record", help="Write the detected landmarks of a video to this .jsonl file")
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror video frames")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args()
+
+    from utils._Digita import HandDetector
+    from utils.ml_gesture_recognizer import MLGestureRecognizer, DEFAULT_MODEL_PATH
+
+    detector = HandDetector(detectionCon=0.8, maxHands=1)
+    recognizer = MLGestureRecognizer(DEFAULT_MODEL_PATH)
+    decider = GestureDecider(detector, recognizer, threshold=args.threshold)
+
+    on_event = None if args.quiet else lambda event: print(json.dumps(event), flush=True)
+    engine = ReplayEngine(decider, detector, realtime=args.realtime, num_slides=args.slides,
+                          flip=not args.no_flip, on_event=on_event)
+
+    if args.source.endswith(".jsonl"):
+        summary = engine.replay_landmarks(args.source)
+    else:
+        recorder = LandmarkRecorder(args.record) if args.record else None
+        try:
+            summary = engine.replay_video(args.source, recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run from the project root: python -m utils.replay_engine recording.mp4
+    main()
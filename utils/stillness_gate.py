@@ -0,0 +1,61 @@
+import numpy as np
+
+from utils.hand_features import normalize_landmarks
+
+
+class StillnessGate:
+    """
+    Reuses the last classification while the hand pose has not changed.
+
+    Poses are compared in normalized landmark space (wrist origin, palm size
+    units, palm pointing up), so moving the whole hand across the frame still
+    counts as the same pose. The comparison is against the last classified
+    pose, not the previous frame, so a slow drift eventually reclassifies.
+    A result is reused for at most max_reuse frames in a row.
+    """
+    def __init__(self, epsilon=0.05, max_reuse=15):
+        self.epsilon = epsilon        # Max landmark movement in palm sizes that counts as still
+        self.max_reuse = max_reuse    # Frames a result may be reused before classifying again
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the cached result, e.g. when the hand leaves the frame"""
+        self.pose = None
+        self.track_id = None
+        self.result = None
+        self.reused = 0
+        self.pending = None
+
+    def lookup(self, landmarks, track_id=None):
+        """The cached result if the pose is still the same, otherwise None (store() the new one)"""
+        pose = normalize_landmarks(landmarks)
+        if self.pose is not None and track_id == self.track_id and self.reused < self.max_reuse:
+            change = float(np.sqrt(((pose - self.pose) ** 2).sum(axis=-1)).max())
+            if change < self.epsilon:
+                self.reused += 1
+                self.hits += 1
+                return self.result
+
+        self.misses += 1
+        self.pending = (pose, track_id)
+        return None
+
+    def store(self, result):
+        """Cache the result of the pose passed to the last missed lookup()"""
+        if self.pending is None:
+            return
+        self.pose, self.track_id = self.pending
+        self.pending = None
+        self.result = result
+        self.reused = 0
+
+    def get_stats(self):
+        """Return hit and miss counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,160 @@
+"""
+Vectorized, seeded generator of synthetic hand landmarks for training.
+
+Hands are built from joint-angle templates: every finger has a curl amount
+between 0 (extended) and 1 (curled) that blends the bend angles of its
+joints. Each sample then gets joint noise, handedness mirroring, rotation,
+scale and a position in the frame, all drawn from one seeded generator, so
+the same seed always produces the same data.
+
+Large sets are produced chunk by chunk; chunk i is drawn from the i-th child
+of the seed, so any chunk can be regenerated on its own. On disk:
+
+    <output>/chunk_00000.landmarks.npy  (N, 21, 3) float32 pixel coordinates
+    <output>/chunk_00000.labels.npy     (N,) int64 class indices
+    <output>/manifest.json
+
+    python -m utils.synthetic_hands --output synthetic/ --total 1000000
+"""
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from utils.atomic_files import save_npy_atomic, write_json_atomic
+
+# Template hand in palm units: wrist at the origin, middle finger base at (0, -1)
+FINGER_BASES = np.array([[-0.3, -0.2, 0.0], [-0.3, -0.95, 0.0], [0.0, -1.0, 0.0],
+                         [0.25, -0.93, 0.0], [0.45, -0.8, 0.0]])
+FINGER_DIRECTIONS = np.array([[-0.7, -0.7], [-0.15, -1.0], [0.0, -1.0], [0.1, -1.0], [0.25, -1.0]])
+THUMB_ACROSS = np.array([0.8, -0.5])  # A curled thumb folds across the palm
+BONE_LENGTHS = np.array([[0.35, 0.3, 0.25], [0.45, 0.3, 0.25], [0.5, 0.33, 0.25],
+                         [0.45, 0.3, 0.25], [0.35, 0.25, 0.2]])
+
+# Cumulative bend (degrees) at the three joints of each finger, away from the camera
+EXTENDED_BEND = np.radians([[5, 10, 15]] * 5)
+CURLED_BEND = np.radians([[30, 60, 120],
+                          [70, 170, 230], [70, 170, 230], [70, 170, 230], [70, 170, 230]])
+
+# Landmark indices of each finger's base and its three following joints
+BASE_INDICES = np.array([1, 5, 9, 13, 17])
+JOINT_INDICES = BASE_INDICES[:, None] + np.arange(1, 4)
+
+# Curl ranges sampled for extended and curled fingers
+EXTENDED_CURL = (0.0, 0.2)
+CURLED_CURL = (0.75, 1.0)
+
+
+def pose_landmarks(curl):
+    """(N, 5) curl amounts (Thumb..Pinky, 0 = extended, 1 = curled) -> (N, 21, 3) landmarks in palm units"""
+    curl = np.asarray(curl, dtype=np.float64)
+    c = curl[..., None]
+    bends = (1 - c) * EXTENDED_BEND + c * CURLED_BEND                   # (N, 5, 3)
+
+    directions = np.broadcast_to(FINGER_DIRECTIONS, curl.shape + (2,)).copy()
+    directions[:, 0] = (1 - c[:, 0]) * FINGER_DIRECTIONS[0] + c[:, 0] * THUMB_ACROSS
+    directions /= np.linalg.norm(directions, axis=-1, keepdims=True)   # (N, 5, 2)
+
+    cos, sin = np.cos(bends), np.sin(bends)
+    bones = np.stack([directions[:, :, None, 0] * cos, directions[:, :, None, 1] * cos, -sin], axis=-1)
+    bones *= BONE_LENGTHS[None, :, :, None]                             # (N, 5, 3, 3)
+
+    landmarks = np.zeros((len(curl), 21, 3))
+    landmarks[:, BASE_INDICES] = FINGER_BASES
+    landmarks[:, JOINT_INDICES] = FINGER_BASES[None, :, None, :] + np.cumsum(bones, axis=2)
+    return landmarks
+
+
+def template_hand(fingers_up):
+    """(21, 3) landmarks in palm units of a hand with the given fingers (Thumb..Pinky) fully extended"""
+    return pose_landmarks(1.0 - np.asarray(fingers_up, dtype=np.float64)[None])[0]
+
+
+def generate(patterns, n, seed=0, scale=(80, 140), rotation=12.0, mirror=0.5, noise=0.02, frame=(640, 480)):
+    """
+    n random hands for the extended-finger patterns (K, 5), drawn uniformly.
+    Returns (n, 21, 3) float32 pixel landmarks and (n,) pattern indices.
+
+    scale: hand size range in pixels (wrist to middle finger base)
+    rotation: standard deviation of the in-plane tilt in degrees
+    mirror: fraction of left hands (mirrored along x)
+    noise: standard deviation of the joint jitter in palm sizes
+    """
+    rng = np.random.default_rng(seed)
+    patterns = np.asarray(patterns, dtype=bool)
+    labels = rng.integers(0, len(patterns), n)
+    up = patterns[labels]
+
+    curl = np.where(up, rng.uniform(*EXTENDED_CURL, (n, 5)), rng.uniform(*CURLED_CURL, (n, 5)))
+    landmarks = pose_landmarks(curl)
+    landmarks += rng.normal(0, noise, landmarks.shape)
+    landmarks[rng.random(n) < mirror, :, 0] *= -1
+
+    angle = np.radians(rng.normal(0, rotation, n))
+    c, s = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    x, y = landmarks[..., 0].copy(), landmarks[..., 1].copy()
+    landmarks[..., 0] = c * x - s * y
+    landmarks[..., 1] = s * x + c * y
+
+    size = rng.uniform(*scale, n)
+    landmarks *= size[:, None, None]
+    # Keep the hand inside the frame: the wrist sits in the lower part, the fingers above it
+    margin = scale[1] * 1.2
+    landmarks[..., 0] += rng.uniform(margin, frame[0] - margin, n)[:, None]
+    landmarks[..., 1] += rng.uniform(margin * 1.5, frame[1] - 0.2 * margin, n)[:, None]
+    return landmarks.astype(np.float32), labels
+
+
+def iter_generate(patterns, total, chunk_size=65536, seed=0, **kwargs):
+    """Yield (landmarks, labels) chunks of generate(); chunk i only depends on seed and i"""
+    n_chunks = -(-total // chunk_size)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        yield generate(patterns, min(chunk_size, total - i * chunk_size), seed=child, **kwargs)
+
+
+def write_dataset(output_dir, patterns, total, chunk_size=65536, seed=0, **kwargs):
+    """Generate total hands into chunk files in output_dir; returns the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = []
+    for i, (landmarks, labels) in enumerate(iter_generate(patterns, total, chunk_size, seed, **kwargs)):
+        name = f"chunk_{i:05d}"
+        save_npy_atomic(os.path.join(output_dir, name + ".landmarks.npy"), landmarks)
+        save_npy_atomic(os.path.join(output_dir, name + ".labels.npy"), labels)
+        chunks.append({"name": name, "samples": len(labels)})
+
+    manifest = {"version": 1, "seed": seed, "total": total, "patterns": np.asarray(patterns).tolist(),
+                "options": kwargs, "chunks": chunks}
+    write_json_atomic(os.path.join(output_dir, "manifest.json"), manifest)
+    return manifest
+
+
+def iter_dataset(output_dir, mmap_mode="r"):
+    """Yield (landmarks, labels) for every chunk of a written dataset, memory-mapped by default"""
+    with open(os.path.join(output_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    for chunk in manifest["chunks"]:
+        base = os.path.join(output_dir, chunk["name"])
+        yield (np.load(base + ".landmarks.npy", mmap_mode=mmap_mode),
+               np.load(base + ".labels.npy", mmap_mode=mmap_mode))
+
+
+def main():
+    from utils.ml_gesture_recognizer import GESTURE_PATTERNS
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic hand landmark dataset")
+    parser.add_argument("--output", required=True, help="Dataset directory")
+    parser.add_argument("--total", type=int, default=1000000, help="Number of hands")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Hands per chunk file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = write_dataset(args.output, list(GESTURE_PATTERNS.values()), args.total, args.chunk_size, args.seed)
+    print(f"{manifest['total']} hands in {len(manifest['chunks'])} chunks, labels: {list(GESTURE_PATTERNS)}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run from the project root: python -m utils.synthetic_hands --output synthetic/
+    main()
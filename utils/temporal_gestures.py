@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+
+# Palm landmarks (wrist and finger bases) whose mean is the tracked hand position
+PALM_POINTS = [0, 5, 9, 13, 17]
+
+
+class LandmarkWindow:
+    """
+    Fixed-size ring buffer of the most recent landmark arrays of one hand.
+
+    Trajectory features are kept up to date incrementally on every push: the
+    path length adds the newest segment and drops the one leaving the window,
+    velocity and hand size are exponential averages. Nothing is recomputed
+    over the whole window, so a push is O(1) regardless of the window size.
+    """
+    def __init__(self, size=12, velocity_smoothing=0.5):
+        self.velocity_smoothing = velocity_smoothing
+        self.resize(size)
+
+    def resize(self, size):
+        """Change the window length; the buffer starts empty"""
+        self.size = max(2, int(size))
+        self.landmarks = np.zeros((self.size, 21, 3), dtype=np.float32)
+        self.anchors = np.zeros((self.size, 2))    # Palm center per frame
+        self.times = np.zeros(self.size)
+        self.segments = np.zeros(self.size)       # Distance moved since the previous frame
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.head = -1          # Index of the newest entry
+        self.path_length = 0.0  # Sum of the segments inside the window
+        self.velocity = np.zeros(2)
+        self.hand_size = 0.0
+
+    def push(self, landmarks, t):
+        """Add one frame of (21, 2+) pixel landmarks taken at time t (seconds)"""
+        lm = np.asarray(landmarks, dtype=np.float32)
+        anchor = lm[PALM_POINTS, :2].mean(axis=0)
+        size = float(np.hypot(*(lm[9, :2] - lm[0, :2])))  # Wrist to middle finger base
+
+        head = (self.head + 1) % self.size
+        if self.count == self.size:
+            # The oldest frame leaves the window, its incoming segment no longer belongs to the path
+            self.path_length -= self.segments[(head + 1) % self.size]
+
+        if self.count:
+            step = anchor - self.anchors[self.head]
+            dt = t - self.times[self.head]
+            segment = float(np.hypot(*step))
+            if dt > 0:
+                a = self.velocity_smoothing
+                self.velocity = a * self.velocity + (1 - a) * step / dt
+            self.hand_size = 0.8 * self.hand_size + 0.2 * size
+        else:
+            segment = 0.0
+            self.hand_size = size
+
+        self.landmarks[head, :, :lm.shape[1]] = lm[:, :3]
+        self.anchors[head] = anchor
+        self.times[head] = t
+        self.segments[head] = segment
+        self.path_length += segment
+        self.head = head
+        self.count = min(self.count + 1, self.size)
+
+    def oldest(self):
+        return (self.head - self.count + 1) % self.size
+
+    def displacement(self):
+        """Palm movement (dx, dy) from the oldest to the newest frame in the window"""
+        return self.anchors[self.head] - self.anchors[self.oldest()]
+
+    def duration(self):
+        return self.times[self.head] - self.times[self.oldest()]
+
+    def straightness(self):
+        """1 for a perfectly straight path, smaller for wiggles and back-and-forth motion"""
+        if self.path_length <= 0:
+            return 0.0
+        return float(np.hypot(*self.displacement())) / self.path_length
+
+
+class SwipeDetector:
+    """
+    Turns a LandmarkWindow into swipe and flick gestures.
+
+    A swipe is a mostly horizontal, mostly straight palm movement of at least
+    min_distance hand sizes within the window; a flick is a shorter movement
+    whose speed exceeds flick_speed hand sizes per second. In the mirrored
+    camera image a movement to the left means "next slide", like turning a page.
+    The hand moving back after a swipe is ignored for return_window seconds.
+    """
+    def __init__(self, min_distance=2.0, min_straightness=0.8, flick_distance=1.0, flick_speed=8.0,
+                 cooldown=0.6, return_window=1.2):
+        self.min_distance = min_distance          # Hand sizes
+        self.min_straightness = min_straightness
+        self.flick_distance = flick_distance      # Hand sizes
+        self.flick_speed = flick_speed            # Hand sizes per second
+        self.cooldown = cooldown                  # Seconds before the next swipe can fire
+        self.return_window = return_window        # Seconds in which the opposite direction is ignored
+        self.last_swipe_time = -math.inf
+        self.last_direction = 0
+
+    def update(self, window, t):
+        """Return "next_slide", "previous_slide" or None for the current window"""
+        if window.count < 3 or window.hand_size <= 0 or t - self.last_swipe_time < self.cooldown:
+            return None
+
+        dx, dy = window.displacement() / window.hand_size
+        if abs(dx) < 2 * abs(dy) or window.straightness() < self.min_straightness:
+            return None
+
+        speed = abs(window.velocity[0]) / window.hand_size
+        swipe = abs(dx) >= self.min_distance
+        flick = abs(dx) >= self.flick_distance and speed >= self.flick_speed
+        if not (swipe or flick):
+            return None
+
+        # Start over so the same movement is not reported again
+        window.clear()
+        direction = -1 if dx < 0 else 1
+        if direction == -self.last_direction and t - self.last_swipe_time < self.return_window:
+            # Hand returning to where the swipe started
+            return None
+
+        self.last_swipe_time = t
+        self.last_direction = direction
+        return "next_slide" if direction < 0 else "previous_slide"